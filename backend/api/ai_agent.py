@@ -1,7 +1,15 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
 import httpx
-from backend.models.schemas.schemas import ScoreRequests, ScoreResponse
+import json
+import logging
+from backend.core.config import settings
+from backend.models.schemas.schemas import ScoreRequests, ScoreResponse, ScoreBatchResponse
+from backend.services import scoring
+from backend.services.resilience import BackendUnavailable
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/ai", tags=["AI Agent"])
 
@@ -9,20 +17,79 @@ router = APIRouter(prefix="/api/ai", tags=["AI Agent"])
 @router.post("/score", response_model=ScoreResponse)
 async def get_score(req: ScoreRequests):
     try:
-        async with httpx.AsyncClient() as client:
-            # response = await  client.post("http://127.0.0.1:8080/score", json=req.dict())
-            response = await client.post("http://host.docker.internal:8080/score", json=req.dict())
-
-            response.raise_for_status()
-
-            raw = response.json()
-            score = raw.get("score", "Something went wrong. No score returned.")
-            print(f"Score : {score}")
-            return {"score": score}
-
+        score = await scoring.score_answer(req)
+        print(f"Score : {score}")
+        return {"score": score}
 
+    except BackendUnavailable as e:
+        raise _unavailable(e)
     except httpx.HTTPError as e:
         return {"score": f"Something wrong with ai: {str(e)}"}
     except Exception as e:
         print(f"General error: {str(e)}")
         return {"score": f"Something wrong with ai: {str(e)}"}
+
+
+def _unavailable(e: BackendUnavailable) -> HTTPException:
+    # Degraded backend: answer at once instead of queueing behind it
+    return HTTPException(
+        status_code=503,
+        detail=f"Scoring is temporarily unavailable: {str(e)}",
+        headers={"Retry-After": str(max(1, round(e.retry_after)))},
+    )
+
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    return (f"event: {event}\n" if event else "") + f"data: {json.dumps(data)}\n\n"
+
+
+async def _sse_events(first: str, chunks: AsyncIterator[str]):
+    parts = [first]
+    yield _sse({"delta": first})
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield _sse({"delta": chunk})
+    except Exception as e:
+        logger.exception("Scoring stream failed")
+        # A stream always ends with a terminal event, so the client knows it is over
+        yield _sse({"detail": f"Something wrong with ai: {str(e) or type(e).__name__}"}, event="error")
+        return
+    yield _sse({"score": "".join(parts)}, event="done")
+
+
+@router.post("/score/stream")
+async def stream_score(req: ScoreRequests):
+    """
+    Relay the scoring feedback as Server-Sent Events while it is generated.
+
+    Each `data:` event carries `{"delta": "..."}`; the stream ends with an `event: done`
+    holding the full `{"score": "..."}`, or an `event: error`.
+    """
+    chunks = scoring.stream_score(req)
+    try:
+        # Wait for the first chunk, so a backend that is down still gets a proper status code
+        first = await anext(chunks, "")
+    except BackendUnavailable as e:
+        raise _unavailable(e)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Something wrong with ai: {str(e)}")
+    except Exception as e:
+        logger.exception("Scoring stream failed to start")
+        raise HTTPException(status_code=502, detail=f"Something wrong with ai: {str(e) or type(e).__name__}")
+
+    return StreamingResponse(
+        _sse_events(first, chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/score/batch", response_model=ScoreBatchResponse)
+async def get_scores(
+    reqs: List[ScoreRequests] = Body(..., min_length=1, max_length=settings.AI_BATCH_MAX_ITEMS),
+):
+    """
+    Score several answers in one round trip; results keep the request order
+    """
+    return {"results": await scoring.score_batch(reqs)}
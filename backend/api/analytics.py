@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Query
+from typing import List
+
+import backend.services.requests.analytics as rq
+from backend.models.schemas.schemas import UserScoreSchema
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+
+@router.get("/leaderboard", response_model=List[UserScoreSchema])
+async def get_leaderboard(
+    limit: int = Query(10, ge=1, le=100, description="Number of top users to return")
+):
+    """
+    Get leaderboard of users ranked by average score
+    """
+    return await rq.get_cached_leaderboard(limit)
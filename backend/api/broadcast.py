@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Depends, Request
+from typing import Optional
+
+import backend.services.requests.broadcast as rq
+from backend.models.schemas.schemas import BroadcastSchema, BroadcastCreateSchema, PageSchema
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.services.conn import request_session, after_commit
+
+router = APIRouter(prefix="/api/broadcasts", tags=["Broadcasts"], dependencies=[Depends(request_session)])
+
+
+def _with_rate(request: Request, broadcast: BroadcastSchema) -> BroadcastSchema:
+    runner = getattr(request.app.state, "broadcast_runner", None)
+    if runner:
+        broadcast.send_rate = runner.send_rate(broadcast.id)
+    return broadcast
+
+
+@router.post("/", response_model=BroadcastSchema, status_code=201)
+async def create_broadcast(request: Request, data: BroadcastCreateSchema, session=Depends(request_session)):
+    """
+    Start sending a reminder or digest to every user. It is sent by the API when the bot runs in
+    webhook mode, otherwise by `python -m backend.services.broadcast --resume`
+    """
+    broadcast = await rq.create_broadcast(data.kind)
+    runner = getattr(request.app.state, "broadcast_runner", None)
+    if runner:
+        after_commit(session, runner.wake)
+    return broadcast
+
+
+@router.get("/", response_model=PageSchema[BroadcastSchema])
+async def get_broadcasts(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+):
+    return await rq.get_broadcasts(limit=limit, cursor=cursor)
+
+
+@router.get("/{broadcast_id}", response_model=BroadcastSchema)
+async def get_broadcast(request: Request, broadcast_id: int = Path(...)):
+    broadcast = await rq.get_broadcast(broadcast_id)
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return _with_rate(request, broadcast)
+
+
+@router.post("/{broadcast_id}/cancel", response_model=BroadcastSchema)
+async def cancel_broadcast(broadcast_id: int = Path(...)):
+    broadcast = await rq.cancel_broadcast(broadcast_id)
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return broadcast
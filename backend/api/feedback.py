@@ -1,14 +1,17 @@
-from fastapi import HTTPException, Path, APIRouter
-from typing import List
+from fastapi import HTTPException, Path, APIRouter, Query, Depends
+from typing import List, Optional
 
 import backend.services.requests.feedback as rq
 from backend.models.schemas.schemas import (
     FeedbackSchema,
+    PageSchema,
     FeedbackCreateSchema,
     FeedbackUpdateSchema,
 )
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.services.conn import request_session
 
-router = APIRouter(prefix="/api/feedbacks", tags=["Feedbacks"])
+router = APIRouter(prefix="/api/feedbacks", tags=["Feedbacks"], dependencies=[Depends(request_session)])
 
 
 @router.post("/", response_model=FeedbackSchema, status_code=201)
@@ -16,9 +19,12 @@ async def create_feedback(feedback_data: FeedbackCreateSchema):
     return await rq.create_feedback(feedback_data)
 
 
-@router.get("/", response_model=List[FeedbackSchema])
-async def get_all_feedbacks():
-    return await rq.get_all_feedbacks()
+@router.get("/", response_model=PageSchema[FeedbackSchema])
+async def get_all_feedbacks(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+):
+    return await rq.get_all_feedbacks(limit=limit, cursor=cursor)
 
 
 @router.get("/{feedback_id}", response_model=FeedbackSchema)
@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+
+from backend.core.db.models import engine
+from backend.core.db.pool import pool_stats
+from backend.services import scoring
+from backend.services.scoring_worker import scoring_workers
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+@router.get("/pool")
+async def get_pool_metrics():
+    """
+    Live database pool usage and checkout wait times, for sizing the pool
+    """
+    return pool_stats(engine.pool)
+
+
+@router.get("/scoring")
+async def get_scoring_metrics():
+    """
+    Scoring result cache hit and miss counters, coalesced in-flight requests, circuit breaker
+    state (state_gauge: 0 closed, 1 half-open, 2 open), bulkhead usage and job worker totals
+    """
+    return {
+        "cache": scoring.score_cache.stats(),
+        "single_flight": scoring.in_flight.stats(),
+        "breaker": scoring.breaker.stats(),
+        "bulkhead": scoring.bulkhead.stats(),
+        "workers": scoring_workers.stats(),
+    }
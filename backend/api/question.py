@@ -1,15 +1,22 @@
-from fastapi import HTTPException, Path, APIRouter
-from typing import List
+from fastapi import HTTPException, Path, APIRouter, Query, Depends, Request
+from typing import List, Optional
 
 import backend.services.requests.question as rq
+from backend.services import question_import
 
 from backend.models.schemas.schemas import (
     QuestionSchema,
+    PageSchema,
     QuestionCreateSchema,
     QuestionUpdateSchema,
+    QuestionImportResultSchema,
 )
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.services.conn import request_session
 
-router = APIRouter(prefix="/api/questions", tags=["Questions"])
+router = APIRouter(prefix="/api/questions", tags=["Questions"], dependencies=[Depends(request_session)])
+# Imports stream for as long as the upload lasts, so they commit batch by batch outside a request-wide transaction
+import_router = APIRouter(prefix="/api/questions", tags=["Questions"])
 
 
 @router.post("/", response_model=QuestionSchema, status_code=201)
@@ -17,9 +24,39 @@ async def create_question(question_data: QuestionCreateSchema):
     return await rq.create_question(question_data)
 
 
-@router.get("/", response_model=List[QuestionSchema])
-async def get_all_questions():
-    return await rq.get_all_questions()
+@import_router.post("/import", response_model=QuestionImportResultSchema)
+async def import_questions(
+    request: Request,
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$", description="jsonl or csv"),
+):
+    """
+    Import a question bank sent as the raw request body (JSONL, or CSV with a header row).
+
+    The body is streamed and upserted in batches keyed on the normalized question text,
+    so re-importing a file only updates what changed. Each batch is committed on its own,
+    so rows imported before an error are kept.
+    """
+    lines = question_import.iter_lines(request.stream())
+    return await question_import.import_questions(question_import.iter_records(lines, format))
+
+
+@router.get("/", response_model=PageSchema[QuestionSchema])
+async def get_all_questions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+):
+    return await rq.get_all_questions(limit=limit, cursor=cursor)
+
+
+@router.get("/random", response_model=QuestionSchema)
+async def get_random_question(
+    part: Optional[int] = Query(None, ge=1, le=3, description="IELTS speaking part"),
+    category: Optional[str] = Query(None, description="Question category"),
+):
+    question = await rq.get_random_question(part, category)
+    if not question:
+        raise HTTPException(status_code=404, detail="No questions available")
+    return question
 
 
 @router.get("/{question_id}", response_model=QuestionSchema)
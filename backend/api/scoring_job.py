@@ -0,0 +1,31 @@
+from fastapi import HTTPException, Path, APIRouter, Depends
+
+import backend.services.requests.scoring_job as rq
+from backend.models.schemas.schemas import ScoringJobSchema, ScoringQueueSchema
+from backend.services.conn import request_session
+
+router = APIRouter(prefix="/api/scoring/jobs", tags=["Scoring Jobs"], dependencies=[Depends(request_session)])
+
+
+@router.get("/", response_model=ScoringQueueSchema)
+async def get_queue_stats():
+    """
+    Number of scoring jobs pending, running, done and failed
+    """
+    return await rq.get_queue_stats()
+
+
+@router.get("/response/{response_id}", response_model=ScoringJobSchema)
+async def get_job_by_response(response_id: int = Path(...)):
+    job = await rq.get_job_by_response(response_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scoring job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=ScoringJobSchema)
+async def get_job(job_id: int = Path(...)):
+    job = await rq.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scoring job not found")
+    return job
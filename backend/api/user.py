@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, Path
-from typing import List
+from fastapi import APIRouter, HTTPException, Path, Query, Depends
+from typing import Optional
 
 import backend.services.requests.user as rq
 from backend.models.schemas.schemas import (
     UserSchema,
+    PageSchema,
     UserCreateSchema,
     UserUpdateSchema,
 )
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.services.conn import request_session
 
-router = APIRouter(prefix="/api/users", tags=["Users"])
+router = APIRouter(prefix="/api/users", tags=["Users"], dependencies=[Depends(request_session)])
 
 
 @router.post("/", response_model=UserSchema, status_code=201)
@@ -16,9 +19,12 @@ async def create_user(user_data: UserCreateSchema):
     return await rq.create_user(user_data)
 
 
-@router.get("/", response_model=List[UserSchema])
-async def get_all_users():
-    return await rq.get_all_users()
+@router.get("/", response_model=PageSchema[UserSchema])
+async def get_all_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+):
+    return await rq.get_all_users(limit=limit, cursor=cursor)
 
 
 @router.get("/{tg_id}", response_model=UserSchema)
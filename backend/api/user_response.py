@@ -1,22 +1,79 @@
-from fastapi import HTTPException, Path, APIRouter
-from typing import List
+from fastapi import HTTPException, Path, APIRouter, Query, Depends, Body
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import datetime
+import csv
+import io
+import json
 
 import backend.services.requests.user_response as rq
 from backend.models.schemas.schemas import (
     UserResponseSchema,
+    PageSchema,
     UserResponseCreateSchema,
     UserResponseUpdateSchema,
+    BulkInsertResultSchema,
 )
-router = APIRouter(prefix="/api/responses", tags=["Responses"])
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.services.conn import request_session
+router = APIRouter(prefix="/api/responses", tags=["Responses"], dependencies=[Depends(request_session)])
 
 @router.post("/", response_model=UserResponseSchema, status_code=201)
 async def create_user_response(response_data: UserResponseCreateSchema):
     return await rq.create_user_response(response_data)
 
 
-@router.get("/", response_model=List[UserResponseSchema])
-async def get_all_responses():
-    return await  rq.get_all_responses()
+@router.post("/bulk", response_model=BulkInsertResultSchema, status_code=201)
+async def create_user_responses(
+    rows: List[UserResponseCreateSchema] = Body(..., min_length=1, max_length=rq.BULK_MAX_ROWS),
+):
+    """
+    Insert up to 10,000 responses in one request; any missing user or question rejects the whole batch
+    """
+    return await rq.create_user_responses(rows)
+
+
+@router.get("/", response_model=PageSchema[UserResponseSchema])
+async def get_all_responses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+):
+    return await rq.get_all_responses(limit=limit, cursor=cursor)
+
+
+EXPORT_FIELDS = list(UserResponseSchema.model_fields)
+
+
+async def _ndjson_export(since: Optional[datetime]):
+    async for batch in rq.stream_responses(since):
+        yield "".join(json.dumps(row, default=datetime.isoformat) + "\n" for row in batch)
+
+
+async def _csv_export(since: Optional[datetime]):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for batch in rq.stream_responses(since):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_responses(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    since: Optional[datetime] = Query(None, description="Only export responses created at or after this time"),
+):
+    if format == "csv":
+        return StreamingResponse(
+            _csv_export(since),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=user_responses.csv"},
+        )
+    return StreamingResponse(_ndjson_export(since), media_type="application/x-ndjson")
 
 
 @router.get("/{response_id}", response_model=UserResponseSchema)
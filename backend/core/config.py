@@ -6,11 +6,60 @@ load_dotenv()
 
 class Settings:
     BOT_TOKEN: str = os.getenv("BOT_TOKEN")
-    AI_API: str = os.getenv("AI_API")
+    BOT_API_URL: str = os.getenv("BOT_API_URL", "https://api.telegram.org/bot")
+    BOT_WEBHOOK_URL: str = os.getenv("BOT_WEBHOOK_URL", "")
+    BOT_WEBHOOK_SECRET: str = os.getenv("BOT_WEBHOOK_SECRET", "")
+    BOT_WEBHOOK_MAX_CONNECTIONS: int = int(os.getenv("BOT_WEBHOOK_MAX_CONNECTIONS", "40"))
+    BOT_CONCURRENT_UPDATES: int = int(os.getenv("BOT_CONCURRENT_UPDATES", "64"))
+    BOT_UPDATE_LEASE_SECONDS: int = int(os.getenv("BOT_UPDATE_LEASE_SECONDS", "60"))
+    BOT_UPDATE_POLL_INTERVAL: float = float(os.getenv("BOT_UPDATE_POLL_INTERVAL", "1"))
+    BOT_SEND_RATE: float = float(os.getenv("BOT_SEND_RATE", "30"))
+    BOT_CHAT_SEND_RATE: float = float(os.getenv("BOT_CHAT_SEND_RATE", "1"))
+    BOT_CHAT_SEND_BURST: float = float(os.getenv("BOT_CHAT_SEND_BURST", "3"))
+    BOT_SEND_CONCURRENCY: int = int(os.getenv("BOT_SEND_CONCURRENCY", "32"))
+    BROADCAST_PAGE_SIZE: int = int(os.getenv("BROADCAST_PAGE_SIZE", "500"))
+    BROADCAST_LEASE_SECONDS: int = int(os.getenv("BROADCAST_LEASE_SECONDS", "120"))
+    BROADCAST_POLL_INTERVAL: float = float(os.getenv("BROADCAST_POLL_INTERVAL", "30"))
+    BOT_STATE_FLUSH_INTERVAL: float = float(os.getenv("BOT_STATE_FLUSH_INTERVAL", "1"))
+    BOT_STATE_BATCH_SIZE: int = int(os.getenv("BOT_STATE_BATCH_SIZE", "500"))
+    BOT_STATE_REFRESH_SECONDS: float = float(os.getenv("BOT_STATE_REFRESH_SECONDS", "30"))
+    AI_API: str = os.getenv("AI_API", "http://host.docker.internal:8080")
+    AI_CONNECT_TIMEOUT: float = float(os.getenv("AI_CONNECT_TIMEOUT", "5"))
+    AI_READ_TIMEOUT: float = float(os.getenv("AI_READ_TIMEOUT", "60"))
+    AI_MAX_CONNECTIONS: int = int(os.getenv("AI_MAX_CONNECTIONS", "100"))
+    AI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("AI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    AI_KEEPALIVE_EXPIRY: float = float(os.getenv("AI_KEEPALIVE_EXPIRY", "30"))
+    AI_HTTP2: bool = os.getenv("AI_HTTP2", "false").lower() == "true"
+    AI_BREAKER_WINDOW: int = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+    AI_BREAKER_FAILURE_RATE: float = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+    AI_BREAKER_MIN_CALLS: int = int(os.getenv("AI_BREAKER_MIN_CALLS", "10"))
+    AI_BREAKER_OPEN_SECONDS: float = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+    AI_BREAKER_HALF_OPEN_CALLS: int = int(os.getenv("AI_BREAKER_HALF_OPEN_CALLS", "3"))
+    AI_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("AI_BREAKER_SLOW_CALL_SECONDS", "20"))
+    AI_BULKHEAD_SIZE: int = int(os.getenv("AI_BULKHEAD_SIZE", "20"))
+    AI_BULKHEAD_WAIT: float = float(os.getenv("AI_BULKHEAD_WAIT", "0.5"))
+    AI_BATCH_CONCURRENCY: int = int(os.getenv("AI_BATCH_CONCURRENCY", "8"))
+    AI_BATCH_MAX_ITEMS: int = int(os.getenv("AI_BATCH_MAX_ITEMS", "100"))
+    SCORE_CACHE_SIZE: int = int(os.getenv("SCORE_CACHE_SIZE", "10000"))
+    SCORE_CACHE_TTL: float = float(os.getenv("SCORE_CACHE_TTL", "86400"))
+    SCORE_CACHE_PATH: str = os.getenv("SCORE_CACHE_PATH", "")
+    SCORING_WORKERS: int = int(os.getenv("SCORING_WORKERS", "4"))
+    SCORING_POLL_INTERVAL: float = float(os.getenv("SCORING_POLL_INTERVAL", "2"))
+    SCORING_LEASE_SECONDS: int = int(os.getenv("SCORING_LEASE_SECONDS", "120"))
+    SCORING_MAX_ATTEMPTS: int = int(os.getenv("SCORING_MAX_ATTEMPTS", "5"))
+    SCORING_RETRY_DELAY: float = float(os.getenv("SCORING_RETRY_DELAY", "5"))
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "300"))
     VOICE2TEXT: str = os.getenv("VOICE2TEXT")
     POSTGRES_USER: str = os.getenv("POSTGRES_USER")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB")
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
 settings = Settings()
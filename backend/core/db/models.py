@@ -1,12 +1,24 @@
 import asyncio
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
 from backend.core.config import settings
+from backend.core.db.pool import InstrumentedPool
 
 print("🧠 [models.py] Loading database setup...")
 
 # Create engine
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine_options = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+if ":memory:" not in settings.DATABASE_URL:
+    # In-memory SQLite needs its single shared connection, so only size real pools
+    engine_options.update(
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+engine = create_async_engine(settings.DATABASE_URL, **engine_options)
 print(f"⚙️ [models.py] Engine created: {engine}")
 
 # Create async session factory
@@ -16,10 +28,30 @@ print(f"📦 [models.py] async_session factory created: {async_session} (type: {
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
+def _add_missing_columns(conn):
+    # create_all skips tables that already exist, so add nullable columns declared after they were created
+    existing = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not existing.has_table(table.name):
+            continue
+        present = {column["name"] for column in existing.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+
+def _create_missing_indexes(conn):
+    # create_all skips tables that already exist, so add indexes declared after they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
 async def init_db():
     print("🚀 [models.py] Running init_db...")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
         print("✅ [models.py] Database schema created")
 
 if __name__ == "__main__":
@@ -1,22 +1,65 @@
-from fastapi import FastAPI, Query
+import hmac
+
+from fastapi import FastAPI, Query, Depends, Header, Request
 from fastapi.exceptions import RequestValidationError, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from typing import Optional
 import uvicorn
 
+from backend.core.config import settings
 from backend.api.error_handle import http_exception_handler, validation_exception_handler
 from backend.core.db.models import init_db
-from backend.services import requests as rq
+import backend.services.requests.tg_integration as rq
+import backend.services.requests.question as question_rq
+import backend.services.requests.rollup as rollup_rq
+from backend.services.conn import request_session
+from backend.services import scoring
+from backend.services.scoring_worker import scoring_workers
 from backend.models.schemas.schemas import UserSchema
-from backend.api import feedback, user, question, user_response, error_handle, ai_agent
+from backend.telegram_bot import SpeakoAIBot
+from backend.services.broadcast import BroadcastRunner
+from backend.api import feedback, user, question, user_response, error_handle, ai_agent, analytics, metrics, scoring_job, broadcast
+
+
+TELEGRAM_WEBHOOK_PATH = "/api/telegram/webhook"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await question_rq.backfill_text_hashes()
+    await rollup_rq.backfill_rollups()
+    scoring.get_client()
+    await scoring.score_cache.purge_expired()
+    scoring_workers.start()
+    app.state.telegram_bot = None
+    app.state.broadcast_runner = None
+    if settings.BOT_WEBHOOK_URL:
+        if not settings.BOT_WEBHOOK_SECRET:
+            raise RuntimeError("BOT_WEBHOOK_SECRET must be set when BOT_WEBHOOK_URL is")
+        # The bot runs on this event loop and its handlers share the API's connection pool
+        app.state.telegram_bot = SpeakoAIBot(webhook=True)
+        await app.state.telegram_bot.start_webhook(
+            settings.BOT_WEBHOOK_URL.rstrip("/") + TELEGRAM_WEBHOOK_PATH, settings.BOT_WEBHOOK_SECRET
+        )
+        # Broadcasts share the bot's outbound scheduler, behind its interactive replies
+        app.state.broadcast_runner = BroadcastRunner(
+            app.state.telegram_bot.application.bot,
+            app.state.telegram_bot.outbox,
+            page_size=settings.BROADCAST_PAGE_SIZE,
+            lease_seconds=settings.BROADCAST_LEASE_SECONDS,
+            poll_interval=settings.BROADCAST_POLL_INTERVAL,
+        )
+        app.state.broadcast_runner.start()
     print("SpeakoAI API is ready!")
     yield
+    if app.state.broadcast_runner:
+        await app.state.broadcast_runner.stop()
+    if app.state.telegram_bot:
+        await app.state.telegram_bot.stop_webhook()
+    await scoring_workers.stop()
+    await scoring.close_client()
 
 
 app = FastAPI(
@@ -45,13 +88,23 @@ async def root():
 app.include_router(feedback.router)
 app.include_router(user.router)
 app.include_router(question.router)
+app.include_router(question.import_router)
 app.include_router(user_response.router)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.include_router(ai_agent.router)
+app.include_router(analytics.router)
+app.include_router(metrics.router)
+app.include_router(scoring_job.router)
+app.include_router(broadcast.router)
 
 
-@app.post("/api/telegram/user", response_model=UserSchema, tags=["Telegram Integration"])
+@app.post(
+    "/api/telegram/user",
+    response_model=UserSchema,
+    tags=["Telegram Integration"],
+    dependencies=[Depends(request_session)],
+)
 async def create_telegram_user(
         tg_id: int = Query(..., description="Telegram user ID"),
         first_name: str = Query(..., description="User's first name"),
@@ -60,6 +113,27 @@ async def create_telegram_user(
     return await rq.set_user(tg_id, first_name, username)
 
 
+@app.post(TELEGRAM_WEBHOOK_PATH, tags=["Telegram Integration"], include_in_schema=False)
+async def telegram_webhook(
+        request: Request,
+        secret_token: Optional[str] = Header(None, alias="X-Telegram-Bot-Api-Secret-Token"),
+):
+    bot = getattr(request.app.state, "telegram_bot", None)
+    if bot is None:
+        raise HTTPException(status_code=404, detail="Webhook mode is not enabled")
+    if not hmac.compare_digest((secret_token or "").encode(), settings.BOT_WEBHOOK_SECRET.encode()):
+        raise HTTPException(status_code=403, detail="Invalid secret token")
+    try:
+        data = await request.json()
+        if not isinstance(data, dict):
+            raise ValueError()
+        # Acknowledge once stored; whichever worker leases the update handles it, so Telegram never times out
+        await bot.process_webhook(data)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid update")
+    return {"ok": True}
+
+
 # --- MAIN ---
 if __name__ == "__main__":
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Generic, Literal, TypeVar
+
+T = TypeVar("T")
 
 
 class QuestionSchema(BaseModel):
@@ -28,6 +30,13 @@ class QuestionUpdateSchema(BaseModel):
     category: Optional[str] = None
 
 
+class QuestionImportResultSchema(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: List[str] = []
+
+
 class UserSchema(BaseModel):
     id: int
     tg_id: int
@@ -90,6 +99,11 @@ class UserResponseUpdateSchema(BaseModel):
     ai_feedback: Optional[str] = None
 
 
+class BulkInsertResultSchema(BaseModel):
+    inserted: int
+    ids: List[int] = []
+
+
 class FeedbackSchema(BaseModel):
     id: int
     user_id: int
@@ -127,6 +141,11 @@ class QuestionWithResponsesSchema(BaseModel):
     total_responses: int = 0
 
 
+class PageSchema(BaseModel, Generic[T]):
+    items: List[T] = []
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
 class ScoreRequests(BaseModel):
     question:str
     answer: str
@@ -134,4 +153,51 @@ class ScoreRequests(BaseModel):
 
 
 class ScoreResponse(BaseModel):
-    score:str
\ No newline at end of file
+    score:str
+
+
+class ScoreBatchItem(BaseModel):
+    score: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ScoreBatchResponse(BaseModel):
+    results: List[ScoreBatchItem]
+
+
+class ScoringJobSchema(BaseModel):
+    id: int
+    response_id: int
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ScoringQueueSchema(BaseModel):
+    pending: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
+
+
+class BroadcastCreateSchema(BaseModel):
+    kind: Literal["reminder", "digest"] = Field(..., description="Daily practice reminder or weekly score digest")
+
+
+class BroadcastSchema(BaseModel):
+    id: int
+    kind: str
+    status: str
+    sent: int = 0
+    failed: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    send_rate: Optional[float] = Field(None, description="Messages per second, while it runs in this process")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -3,7 +3,12 @@ from .user import User
 from .feedback import Feedback
 from .question import Question
 from .user_response import UserResponse
+from .user_score_rollup import UserScoreRollup
+from .scoring_job import ScoringJob
+from .bot_state import BotState
+from .bot_update import BotUpdate
+from .broadcast import Broadcast
 from backend.core.db.models import Base
 
 # This ensures all models are loaded when you import from models
-__all__ = ["User", "Feedback", "Question", "UserResponse", "Base"]
\ No newline at end of file
+__all__ = ["User", "Feedback", "Question", "UserResponse", "UserScoreRollup", "ScoringJob", "BotState", "BotUpdate", "Broadcast", "Base"]
\ No newline at end of file
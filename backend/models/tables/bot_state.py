@@ -0,0 +1,15 @@
+from backend.core.db.models import Base
+from sqlalchemy import func, BigInteger, Integer, JSON
+from sqlalchemy.types import DateTime
+from sqlalchemy.orm import  Mapped, mapped_column
+import datetime
+
+
+class BotState(Base):
+    """Telegram bot conversation state of one user, shared by every bot process"""
+    __tablename__ = "bot_states"
+
+    tg_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    data: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)  # compact form, see services/bot_persistence.py
+    version: Mapped[int] = mapped_column(Integer, nullable=True)  # bumped on every write; NULL counts as 0
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,26 @@
+from backend.core.db.models import Base
+from sqlalchemy import func, BigInteger, String, Integer, JSON, Index
+from sqlalchemy.types import DateTime
+from sqlalchemy.orm import  Mapped, mapped_column
+import datetime
+
+
+class BotUpdate(Base):
+    """A Telegram update received by the webhook and not handled yet.
+
+    Bot processes lease the oldest update of a chat no other process is handling, so
+    any number of API workers can take webhook updates and each chat's still run in
+    order. A handled update is deleted.
+    """
+    __tablename__ = "bot_updates"
+    __table_args__ = (
+        Index("ix_bot_updates_chat_id_status", "chat_id", "status"),
+    )
+
+    update_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=True)  # None for updates without a chat
+    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)  # pending, running
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    leased_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,31 @@
+from backend.core.db.models import Base
+from sqlalchemy import func, String, Integer, Index
+from sqlalchemy.types import DateTime
+from sqlalchemy.orm import  Mapped, mapped_column
+import datetime
+
+
+class Broadcast(Base):
+    """A message sent to every user, with its progress.
+
+    ``cursor`` is the keyset position of the last user handled, so an interrupted
+    broadcast resumes after it. A runner holds the broadcast while ``leased_until``
+    is in the future; ``lease`` is bumped on every claim and fences off a runner
+    that lost it.
+    """
+    __tablename__ = "broadcasts"
+    __table_args__ = (
+        Index("ix_broadcasts_created_at", "created_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # reminder, digest
+    status: Mapped[str] = mapped_column(String(20), default="running", nullable=False)  # running, done, cancelled
+    cursor: Mapped[str] = mapped_column(String(100), nullable=True)
+    sent: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    failed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    lease: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    leased_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
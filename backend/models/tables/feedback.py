@@ -1,6 +1,6 @@
 
 from backend.core.db.models import Base
-from sqlalchemy import  ForeignKey, func, Text
+from sqlalchemy import  ForeignKey, func, Text, Index
 from sqlalchemy.types import DateTime
 from sqlalchemy.orm import  Mapped, mapped_column, relationship
 import datetime
@@ -8,6 +8,10 @@ import datetime
 
 class Feedback(Base):
     __tablename__ = "feedbacks"
+    __table_args__ = (
+        Index("ix_feedbacks_user_id_created_at", "user_id", "created_at"),
+        Index("ix_feedbacks_created_at", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -1,6 +1,6 @@
 
 from backend.core.db.models import Base
-from sqlalchemy import   func, String, Integer, Text
+from sqlalchemy import   func, String, Integer, Text, Index
 from sqlalchemy.types import DateTime
 from sqlalchemy.orm import  Mapped, mapped_column, relationship
 import datetime
@@ -11,12 +11,19 @@ import datetime
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_part", "part", "id"),
+        Index("ix_questions_category", "category", "id"),
+        Index("ix_questions_created_at", "created_at", "id"),
+        Index("ux_questions_text_hash", "text_hash", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     part: Mapped[int] = mapped_column(Integer, nullable=False)  # 1, 2, or 3 for IELTS parts
     question_text: Mapped[str] = mapped_column(Text, nullable=False)
     sample_answer: Mapped[str] = mapped_column(Text, nullable=True)
     category: Mapped[str] = mapped_column(String(100), nullable=True)  # e.g., "Family", "Work", "Hobbies"
+    text_hash: Mapped[str] = mapped_column(String(64), nullable=True)  # sha256 of the normalized question_text
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     # Relationships
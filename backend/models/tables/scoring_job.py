@@ -0,0 +1,27 @@
+from backend.core.db.models import Base
+from sqlalchemy import ForeignKey, func, String, Integer, Text, Index
+from sqlalchemy.types import DateTime
+from sqlalchemy.orm import  Mapped, mapped_column
+import datetime
+
+
+class ScoringJob(Base):
+    """A user response waiting to be scored by the AI backend.
+
+    Workers lease pending jobs with SELECT ... FOR UPDATE SKIP LOCKED; a lease
+    that runs past ``leased_until`` is picked up again, so jobs survive restarts.
+    """
+    __tablename__ = "scoring_jobs"
+    __table_args__ = (
+        Index("ix_scoring_jobs_status_run_after", "status", "run_after", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    response_id: Mapped[int] = mapped_column(ForeignKey("user_responses.id", ondelete="CASCADE"), unique=True)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)  # pending, running, done, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    run_after: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    leased_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,6 @@
 
 from backend.core.db.models import Base
-from sqlalchemy import func,  BigInteger, String
+from sqlalchemy import func,  BigInteger, String, Index
 from sqlalchemy.types import DateTime
 from sqlalchemy.orm import  Mapped, mapped_column, relationship
 import datetime
@@ -8,6 +8,9 @@ import datetime
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at", "created_at", "id"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
     first_name: Mapped[str] = mapped_column(String(25))
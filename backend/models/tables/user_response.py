@@ -1,6 +1,6 @@
 
 from backend.core.db.models import Base
-from sqlalchemy import ForeignKey, func, String, Float,Text
+from sqlalchemy import ForeignKey, func, String, Float,Text, Index
 from sqlalchemy.types import DateTime
 from sqlalchemy.orm import  Mapped, mapped_column, relationship
 import datetime
@@ -8,6 +8,11 @@ import datetime
 
 class UserResponse(Base):
     __tablename__ = "user_responses"
+    __table_args__ = (
+        Index("ix_user_responses_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_user_responses_question_id_created_at", "question_id", "created_at", "id"),
+        Index("ix_user_responses_created_at", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -0,0 +1,27 @@
+
+from backend.core.db.models import Base
+from sqlalchemy import ForeignKey, func, Integer, Float, JSON
+from sqlalchemy.types import DateTime
+from sqlalchemy.orm import  Mapped, mapped_column
+import datetime
+
+
+class UserScoreRollup(Base):
+    """Per-user score totals, kept in step with user_responses on every write"""
+    __tablename__ = "user_score_rollups"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    response_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    overall_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    overall_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    fluency_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fluency_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    pronunciation_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pronunciation_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    grammar_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    grammar_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    vocabulary_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    vocabulary_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    best_score: Mapped[float] = mapped_column(Float, nullable=True)
+    recent_scores: Mapped[list] = mapped_column(JSON, default=list, nullable=False)  # [[response_id, overall_score], ...] newest first
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from backend.models.schemas.schemas import QuestionSchema
+from backend.services.requests import bot_state as rq_state
+from backend.services.requests.question import question_catalog
+
+logger = logging.getLogger(__name__)
+
+QUESTION_MARKER = "$question"
+
+
+def encode_user_data(data: dict) -> dict:
+    """Compact JSON form of a user's bot state: questions are stored by id"""
+    return {
+        key: {QUESTION_MARKER: value.id} if isinstance(value, QuestionSchema) else value
+        for key, value in data.items()
+    }
+
+
+async def decode_user_data(state: dict) -> dict:
+    data = {}
+    for key, value in state.items():
+        if isinstance(value, dict) and QUESTION_MARKER in value:
+            value = await question_catalog.get(value[QUESTION_MARKER])
+            if value is None:  # deleted since
+                continue
+        data[key] = value
+    return data
+
+
+class DatabasePersistence(BasePersistence):
+    """Keeps ``context.user_data`` in the bot_states table so it survives restarts and redeploys.
+
+    Nothing is read at startup: a user's state is loaded when one of their updates is
+    handled, and read again once the local copy is older than ``refresh_seconds``
+    unless it has changed since.
+    Changed states are buffered and written every ``update_interval`` seconds, or as
+    soon as ``batch_size`` are waiting, as one upsert. A write only goes through if the
+    user's row is still at the version this process read; otherwise another process
+    wrote it first, the change is dropped and the user's state is read again.
+    """
+
+    def __init__(self, update_interval: float, batch_size: int, refresh_seconds: float):
+        super().__init__(store_data=PersistenceInput(bot_data=False, chat_data=False, callback_data=False),
+                         update_interval=update_interval)
+        self.batch_size = batch_size
+        self.refresh_seconds = refresh_seconds
+        self._stored: Dict[int, dict] = {}  # last state known to be in the database
+        self._loaded_at: Dict[int, float] = {}
+        self._versions: Dict[int, int] = {}  # version of the state in _stored
+        self._buffer: Dict[int, dict] = {}  # changed states waiting to be written
+        self._flushing: Dict[int, dict] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.writes = 0
+        self.flushes = 0
+        self.conflicts = 0
+
+    async def get_user_data(self) -> Dict[int, dict]:
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        if user_id in self._buffer or user_id in self._flushing:
+            return  # the local copy is newer than the database
+        if user_id in self._stored and encode_user_data(user_data) != self._stored[user_id]:
+            return  # changed by a handler, not handed to update_user_data yet
+        loaded_at = self._loaded_at.get(user_id)
+        if loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds:
+            return
+
+        state, version = await rq_state.get_bot_state(user_id)
+        state = state or {}
+        self.loads += 1
+        self._stored[user_id] = state
+        self._versions[user_id] = version
+        self._loaded_at[user_id] = time.monotonic()
+        user_data.clear()
+        user_data.update(await decode_user_data(state))
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        state = encode_user_data(data)
+        latest = self._buffer.get(user_id, self._flushing.get(user_id, self._stored.get(user_id)))
+        if state == latest:
+            return  # only used, not changed
+        self._buffer[user_id] = state
+        if len(self._buffer) >= self.batch_size:
+            await self._flush_quietly()
+        elif self._flush_task is None or self._flush_task.done():
+            # The application hands over every used user of this interval in one go, so write them together
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    async def _flush_soon(self):
+        await asyncio.sleep(0)
+        await self._flush_quietly()
+
+    async def _flush_quietly(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error writing bot states, will retry: {e}")
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._buffer.pop(user_id, None)
+        self._stored.pop(user_id, None)
+        self._loaded_at.pop(user_id, None)
+        self._versions.pop(user_id, None)
+        await rq_state.delete_bot_state(user_id)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            while self._buffer:
+                batch = dict(list(self._buffer.items())[:self.batch_size])
+                for user_id in batch:
+                    del self._buffer[user_id]
+                self._flushing = batch
+                try:
+                    written = await rq_state.save_bot_states({
+                        user_id: (state, self._versions.get(user_id, 0)) for user_id, state in batch.items()
+                    })
+                except BaseException:
+                    # Put the batch back unless a newer state was buffered meanwhile
+                    self._buffer = {**batch, **self._buffer}
+                    raise
+                finally:
+                    self._flushing = {}
+                now = time.monotonic()
+                for user_id, state in batch.items():
+                    if user_id in written:
+                        self._stored[user_id] = state
+                        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                        self._loaded_at[user_id] = now
+                    else:
+                        logger.warning(f"Bot state of user {user_id} was changed by another process, reloading it")
+                        self._stored.pop(user_id, None)
+                        self._versions.pop(user_id, None)
+                        self._loaded_at.pop(user_id, None)
+                        self.conflicts += 1
+                self.writes += len(written)
+                self.flushes += 1
+
+    def stats(self) -> dict:
+        return {
+            "cached_users": len(self._stored),
+            "buffered": len(self._buffer),
+            "loads": self.loads,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "conflicts": self.conflicts,
+        }
+
+    # Only user_data is persisted
+    async def get_chat_data(self):
+        return {}
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def get_bot_data(self):
+        return {}
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def get_callback_data(self):
+        return None
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def get_conversations(self, name):
+        return {}
+
+    async def update_conversation(self, name, key, new_state):
+        pass
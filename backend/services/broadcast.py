@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Broadcasts to every registered user: a daily practice reminder or a weekly score digest.
+
+Users are read a page at a time with a keyset cursor, each message is rendered from
+the user's score rollup, and messages go out through the bot's outbound scheduler
+in the broadcast lane, so interactive replies keep priority. Progress is
+checkpointed after every page; an interrupted broadcast is resumed after the last
+checkpoint by whichever runner claims it next. The API runs one when the bot is in
+webhook mode; otherwise run one from the command line:
+
+    python -m backend.services.broadcast reminder|digest
+    python -m backend.services.broadcast --resume
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import Dict, Iterable, Optional
+
+from telegram import Bot
+
+from backend.core.config import settings
+from backend.models.tables.broadcast import Broadcast
+from backend.services.outbound import OutboundScheduler, BROADCAST
+from backend.services.requests import broadcast as rq
+
+logger = logging.getLogger(__name__)
+
+REPORT_INTERVAL = 10  # seconds between progress log lines
+
+
+def _average(rollup, field: str) -> Optional[float]:
+    count = getattr(rollup, f"{field}_count")
+    return getattr(rollup, f"{field}_sum") / count if count else None
+
+
+def _format(score: Optional[float]) -> str:
+    return f"{score:.1f}" if score is not None else "-"
+
+
+def render_reminder(row) -> str:
+    rollup = row.UserScoreRollup
+    if rollup is None or not rollup.response_count:
+        return (f"👋 Hi {row.first_name}! Your first IELTS speaking answer is one tap away. "
+                f"Use /practice to get a question.")
+    return (f"👋 Hi {row.first_name}! Time for today's IELTS speaking practice. "
+            f"You have answered {rollup.response_count} questions so far, keep it going with /practice.")
+
+
+def render_digest(row) -> str:
+    rollup = row.UserScoreRollup
+    if rollup is None or not rollup.response_count:
+        return (f"📊 Your weekly SpeakoAI digest, {row.first_name}\n\n"
+                f"No answers yet. Use /practice to get your first band scores!")
+    recent = [score for _, score in rollup.recent_scores if score is not None]
+    return (
+        f"📊 Your weekly SpeakoAI digest, {row.first_name}\n\n"
+        f"Answers: {rollup.response_count}\n"
+        f"Average band: {_format(_average(rollup, 'overall'))}\n"
+        f"Best band: {_format(rollup.best_score)}\n"
+        f"Fluency {_format(_average(rollup, 'fluency'))} · Pronunciation {_format(_average(rollup, 'pronunciation'))} · "
+        f"Grammar {_format(_average(rollup, 'grammar'))} · Vocabulary {_format(_average(rollup, 'vocabulary'))}\n"
+        f"Latest: {', '.join(_format(score) for score in recent) or '-'}\n\n"
+        f"Use /practice to keep improving!"
+    )
+
+
+RENDERERS = {"reminder": render_reminder, "digest": render_digest}
+
+
+class _Progress:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+
+    def count(self, future: asyncio.Future):
+        if future.cancelled():
+            return
+        if future.exception():
+            self.failed += 1
+        else:
+            self.sent += 1
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return round((self.sent + self.failed) / elapsed, 1) if elapsed > 0 else 0.0
+
+
+class BroadcastRunner:
+    """Claims running broadcasts and sends them, one at a time"""
+
+    def __init__(self, bot: Bot, outbox: OutboundScheduler, page_size: int, lease_seconds: int,
+                 poll_interval: float):
+        self.bot = bot
+        self.outbox = outbox
+        self.page_size = page_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.progress: Dict[int, _Progress] = {}
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="broadcast-runner")
+
+    async def stop(self):
+        """Stop sending; the broadcast resumes from its last checkpoint once its lease expires"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if not await self.run_next():
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_next(self) -> bool:
+        """Claim and send one broadcast; False if there was none to claim"""
+        try:
+            broadcast = await rq.claim_broadcast(self.lease_seconds)
+        except Exception as e:
+            logger.error(f"Could not claim a broadcast: {e}")
+            return False
+        if broadcast is None:
+            return False
+        try:
+            await self.send(broadcast)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast {broadcast.id} stopped, it resumes once its lease expires: {e}")
+        return True
+
+    async def send(self, broadcast: Broadcast):
+        render = RENDERERS[broadcast.kind]
+        progress = self.progress[broadcast.id] = _Progress()
+        reported = time.monotonic()
+        logger.info(f"Broadcast {broadcast.id} ({broadcast.kind}) {'resumed' if broadcast.cursor else 'started'}")
+
+        next_page = asyncio.create_task(rq.get_recipients(self.page_size, broadcast.cursor))
+        try:
+            while True:
+                rows, cursor = await next_page
+                if cursor:
+                    # Read the next page while this one is being sent
+                    next_page = asyncio.create_task(rq.get_recipients(self.page_size, cursor))
+                futures = [
+                    self.outbox.submit(row.tg_id, self._sender(row.tg_id, render(row)), BROADCAST) for row in rows
+                ]
+                for future in futures:
+                    future.add_done_callback(progress.count)
+                results = await asyncio.gather(*futures, return_exceptions=True)
+
+                failed = sum(isinstance(result, Exception) for result in results)
+                finished = cursor is None
+                held = await rq.save_progress(
+                    broadcast.id, broadcast.lease, rq.position(rows[-1]) if rows else broadcast.cursor,
+                    len(results) - failed, failed, finished, self.lease_seconds,
+                )
+                if not held:
+                    logger.warning(f"Broadcast {broadcast.id} was cancelled or taken over, stopping")
+                    return
+                if time.monotonic() - reported >= REPORT_INTERVAL or finished:
+                    reported = time.monotonic()
+                    logger.info(f"Broadcast {broadcast.id}: {progress.sent} sent, {progress.failed} failed, "
+                                f"{progress.rate()} msg/s")
+                if finished:
+                    return
+        finally:
+            next_page.cancel()
+            self.progress.pop(broadcast.id, None)
+
+    def _sender(self, chat_id: int, text: str):
+        return lambda: self.bot.send_message(chat_id, text)
+
+    def send_rate(self, broadcast_id: int) -> Optional[float]:
+        progress = self.progress.get(broadcast_id)
+        return progress.rate() if progress else None
+
+
+def parse_args(argv: Iterable[str] = None):
+    parser = argparse.ArgumentParser(description="Send a broadcast to every user")
+    parser.add_argument("kind", nargs="?", choices=sorted(RENDERERS), help="Broadcast to start")
+    parser.add_argument("--resume", action="store_true", help="Only finish interrupted broadcasts")
+    args = parser.parse_args(argv)
+    if not args.kind and not args.resume:
+        parser.error("give a broadcast kind or --resume")
+    return args
+
+
+async def main() -> int:
+    args = parse_args()
+    import backend.models.tables  # noqa: F401  (register every table)
+    from backend.core.db.models import engine, init_db
+
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    await init_db()
+    if args.kind:
+        await rq.create_broadcast(args.kind)
+
+    bot = Bot(settings.BOT_TOKEN, base_url=settings.BOT_API_URL)
+    outbox = OutboundScheduler(
+        rate=settings.BOT_SEND_RATE,
+        chat_rate=settings.BOT_CHAT_SEND_RATE,
+        chat_burst=settings.BOT_CHAT_SEND_BURST,
+        max_in_flight=settings.BOT_SEND_CONCURRENCY,
+    )
+    runner = BroadcastRunner(bot, outbox, settings.BROADCAST_PAGE_SIZE, settings.BROADCAST_LEASE_SECONDS,
+                             settings.BROADCAST_POLL_INTERVAL)
+    async with bot:
+        while await runner.run_next():
+            pass
+        await outbox.stop()
+    await engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,20 +1,82 @@
-from backend.core.db.models import async_session
+import functools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.db.models import async_session, engine
+
+_current_session: ContextVar[Optional[AsyncSession]] = ContextVar("current_session", default=None)
 
-print(f"🔍 [conn.py] async_session imported: {async_session} (type: {type(async_session)})")
 
 def connection(func):
-    async def inner(*args, **kwargs):
-        print(f"🔧 [conn.py] About to open session from: {async_session}")
-        session_obj = async_session()
-        print(f"🧪 [conn.py] session_obj = async_session(): {session_obj} (type: {type(session_obj)})")
+    """Run a service function with a database session.
 
-        try:
-            async with session_obj as session:
-                print("✅ [conn.py] Successfully opened session")
-                result = await func(session, *args, **kwargs)
-                print("🔁 [conn.py] Function executed with DB session")
-                return result
-        except Exception as e:
-            print(f"❌ [conn.py] Exception inside connection wrapper: {e}")
-            raise e
+    The session is, in order of preference, an explicit ``session=`` keyword, the
+    session of the surrounding unit of work, or a fresh session opened just for
+    this call.
+    """
+    @functools.wraps(func)
+    async def inner(*args, session: Optional[AsyncSession] = None, **kwargs):
+        session = session or _current_session.get()
+        if session is not None:
+            return await func(session, *args, **kwargs)
+
+        async with async_session() as session:
+            result = await func(session, *args, **kwargs)
+        _run_after_commit(session)
+        return result
     return inner
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[AsyncSession]:
+    """Share one connection and one transaction between every service call inside the block.
+
+    The session joins an outer transaction in ``rollback_only`` mode, so a service's
+    own ``commit()`` only flushes; the block commits once at the end, or rolls back
+    if it raises.
+    """
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = async_session(bind=conn, join_transaction_mode="rollback_only")
+        token = _current_session.set(session)
+        try:
+            yield session
+            await session.flush()
+            if transaction.is_active:
+                await transaction.commit()
+        except BaseException:
+            if transaction.is_active:
+                await transaction.rollback()
+            raise
+        finally:
+            _current_session.reset(token)
+            await session.close()
+    _run_after_commit(session)
+
+
+async def request_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that runs the whole request in one unit of work"""
+    async with unit_of_work() as session:
+        yield session
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]):
+    """Run ``callback`` once the session's work is really committed"""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+def _run_after_commit(session: AsyncSession):
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+def dialect_insert(session):
+    """Return the insert() construct of the session's dialect, which supports ON CONFLICT clauses"""
+    if session.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
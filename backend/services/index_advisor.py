@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Index advisor for the service layer.
+
+Seeds a database (a throwaway SQLite file unless --database-url is given), calls
+every read function of the service layer, captures the SELECTs they emit and runs
+EXPLAIN on each one. Any query that sequentially scans a table is flagged, and the
+exit status is 1 if anything was flagged.
+
+    python -m backend.services.index_advisor [--database-url URL] [--responses N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Queries whose full scans are expected: the leaderboard ranks every user's rollup
+# (one row per user) and is served from LeaderboardCache rather than per request.
+ALLOWED_SCANS = {"analytics.get_leaderboard"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="EXPLAIN every service-layer query and flag sequential scans")
+    parser.add_argument("--database-url", help="Database to seed and explain against (default: temporary SQLite file)")
+    parser.add_argument("--responses", type=int, default=20000, help="Number of user responses to seed")
+    return parser.parse_args()
+
+
+async def seed(session, responses: int):
+    """Fill empty tables with enough rows for the planner to prefer indexes"""
+    from sqlalchemy import insert, select, func
+    from backend.models.tables import User, Question, UserResponse, Feedback
+
+    if await session.scalar(select(func.count(User.id))):
+        print("Database already has users, skipping seeding")
+        return
+
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    users = max(responses // 50, 10)
+    questions = 300
+    categories = [f"Category {i}" for i in range(30)]
+
+    await session.execute(insert(User), [
+        {"tg_id": 1_000_000 + i, "first_name": f"User {i}", "created_at": start + timedelta(minutes=i)}
+        for i in range(users)
+    ])
+    await session.execute(insert(Question), [
+        {"part": i % 3 + 1, "question_text": f"Seeded question number {i}?", "category": rng.choice(categories),
+         "created_at": start + timedelta(minutes=i)}
+        for i in range(questions)
+    ])
+    await session.execute(insert(UserResponse), [
+        {"user_id": rng.randint(1, users), "question_id": rng.randint(1, questions),
+         "response_text": "Seeded response text", "overall_score": round(rng.uniform(4, 9), 1),
+         "created_at": start + timedelta(seconds=i)}
+        for i in range(responses)
+    ])
+    await session.execute(insert(Feedback), [
+        {"user_id": rng.randint(1, users), "ai_comment": "Seeded feedback comment",
+         "created_at": start + timedelta(seconds=i)}
+        for i in range(responses // 10)
+    ])
+    await session.commit()
+
+    from backend.services.requests.rollup import rebuild_rollups
+    await rebuild_rollups()
+
+
+async def exercise_services():
+    """Call every service-layer read once, including a second page of each list"""
+    from backend.services.requests import user, question, user_response, feedback, analytics
+
+    list_pages = [
+        ("user.get_all_users", user.get_all_users),
+        ("question.get_all_questions", question.get_all_questions),
+        ("user_response.get_all_responses", user_response.get_all_responses),
+        ("feedback.get_all_feedbacks", feedback.get_all_feedbacks),
+    ]
+    for name, list_page in list_pages:
+        page = await list_page(limit=20)
+        yield name
+        await list_page(limit=20, cursor=page.next_cursor)
+        yield f"{name} (cursor)"
+
+    calls = [
+        ("user.get_user", lambda: user.get_user(1_000_001)),
+        ("user.get_user_by_id", lambda: user.get_user_by_id(2)),
+        ("question.get_question", lambda: question.get_question(2)),
+        ("question.get_questions_by_part", lambda: question.get_questions_by_part(2)),
+        ("question.get_questions_by_category", lambda: question.get_questions_by_category("Category 3")),
+        ("user_response.get_user_response", lambda: user_response.get_user_response(2)),
+        ("user_response.get_user_responses", lambda: user_response.get_user_responses(2)),
+        ("user_response.get_responses_by_question", lambda: user_response.get_responses_by_question(2)),
+        ("feedback.get_feedback", lambda: feedback.get_feedback(2)),
+        ("feedback.get_user_feedbacks", lambda: feedback.get_user_feedbacks(2)),
+        ("analytics.get_user_scores", lambda: analytics.get_user_scores(2)),
+        ("analytics.get_leaderboard", lambda: analytics.get_leaderboard(10)),
+    ]
+    for name, call in calls:
+        await call()
+        yield name
+
+
+def sequential_scans(dialect: str, plan: list) -> list:
+    """Return the plan lines that read a whole table"""
+    if dialect == "sqlite":
+        # "SCAN users" is a full scan, "SCAN users USING INDEX ..." walks an index
+        return [line for line in plan if line.startswith("SCAN ") and " USING " not in line]
+    return [line for line in plan if "Seq Scan on" in line]
+
+
+async def explain(engine, statement: str, parameters) -> list:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(prefix + statement, parameters)
+        # SQLite returns (id, parent, notused, detail); PostgreSQL returns one text column
+        return [row[-1].strip() for row in result]
+
+
+async def main() -> int:
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url or (
+        "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "index_advisor.db")
+    )
+
+    from sqlalchemy import event
+    import backend.models.tables  # noqa: F401  (register every table)
+    from backend.core.db.models import engine, init_db, async_session
+
+    engine.echo = False
+    await init_db()
+    async with async_session() as session:
+        await seed(session, args.responses)
+
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("ANALYZE")
+    else:
+        async with engine.connect() as conn:
+            await (await conn.execution_options(isolation_level="AUTOCOMMIT")).exec_driver_sql("ANALYZE")
+
+    captured = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    queries = []
+    async for name in exercise_services():
+        queries += [(name, statement, parameters) for statement, parameters in captured]
+        captured.clear()
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    flagged = 0
+    for name, statement, parameters in queries:
+        plan = await explain(engine, statement, parameters)
+        scans = sequential_scans(engine.dialect.name, plan)
+        if name in ALLOWED_SCANS:
+            status, scans = "allowed", []
+        else:
+            status = "SEQ SCAN" if scans else "ok"
+        print(f"[{status:>8}] {name}")
+        for line in scans:
+            print(f"           {line}")
+        flagged += bool(scans)
+
+    await engine.dispose()
+    print(f"\n{len(queries)} queries explained, {flagged} with sequential scans")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,285 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, most urgent first
+INTERACTIVE, BROADCAST = 0, 1
+LANES = (INTERACTIVE, BROADCAST)
+LANE_NAMES = {INTERACTIVE: "interactive", BROADCAST: "broadcast"}
+PRUNE_INTERVAL = 60  # seconds between sweeps of idle chats
+
+
+class TokenBucket:
+    """Allow ``rate`` operations per second on average, and bursts of up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Message:
+    __slots__ = ("send", "future")
+
+    def __init__(self, send: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        self.send = send
+        self.future = future
+
+
+class _Chat:
+    __slots__ = ("id", "bucket", "lanes", "busy", "lane", "waiting")
+
+    def __init__(self, chat_id: int, bucket: TokenBucket):
+        self.id = chat_id
+        self.bucket = bucket
+        self.lanes: List[Deque[_Message]] = [deque() for _ in LANES]
+        self.busy = False  # a message of this chat is being sent
+        self.lane: Optional[int] = None  # ready queue the chat is in
+        self.waiting = False  # in the throttled heap
+
+    def next_lane(self) -> Optional[int]:
+        return next((lane for lane in LANES if self.lanes[lane]), None)
+
+
+def _seconds(retry_after) -> float:
+    return retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+
+
+class OutboundScheduler:
+    """Send Bot API requests within Telegram's flood limits.
+
+    A global token bucket caps the send rate of the bot and a bucket per chat caps the
+    rate into each chat. Messages of one chat go out one at a time in the order they
+    were submitted; across chats, interactive replies are sent before broadcasts, and
+    chats of one lane take turns. A 429 pauses all sending for its ``retry_after`` and
+    the message is sent again, so callers never see flood errors and ``submit`` never
+    waits for the network.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        max_in_flight: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_in_flight = max_in_flight
+        self._clock = clock
+        self._global = TokenBucket(rate, max(1.0, rate / 10), clock())
+        self._chats: Dict[int, _Chat] = {}
+        self._ready: List[Deque[_Chat]] = [deque() for _ in LANES]
+        self._throttled: List[tuple] = []  # heap of (ready_at, seq, chat)
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._queued = [0 for _ in LANES]
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()  # the loop only keeps weak references to tasks
+        self._pruned_at = clock()
+        self.sent = [0 for _ in LANES]
+        self.failed = 0
+        self.rate_limited = 0
+
+    def submit(self, chat_id: int, send: Callable[[], Awaitable[Any]], priority: int = INTERACTIVE) -> asyncio.Future:
+        """Queue ``send`` (e.g. ``lambda: bot.send_message(chat_id, text)``); the future resolves to its result"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        # Errors are logged here; a caller that doesn't await the future shouldn't trigger asyncio's warning
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _Chat(chat_id, TokenBucket(self.chat_rate, self.chat_burst, self._clock()))
+        chat.lanes[priority].append(_Message(send, future))
+        self._queued[priority] += 1
+        self._idle.clear()
+
+        if chat.lane is not None and priority < chat.lane:
+            chat.lane = priority  # move ahead; the entry left in the slower lane is skipped
+            self._ready[priority].append(chat)
+        else:
+            self._schedule(chat)
+        self._wakeup.set()
+        return future
+
+    def _schedule(self, chat: _Chat):
+        """Put a chat with pending messages in its ready queue, or in the throttled heap until its bucket refills"""
+        if chat.busy or chat.lane is not None or chat.waiting:
+            return
+        lane = chat.next_lane()
+        if lane is None:
+            return
+        delay = chat.bucket.delay(self._clock())
+        if delay > 0:
+            chat.waiting = True
+            heapq.heappush(self._throttled, (self._clock() + delay, next(self._seq), chat))
+        else:
+            chat.lane = lane
+            self._ready[lane].append(chat)
+
+    def _release_throttled(self, now: float):
+        while self._throttled and self._throttled[0][0] <= now:
+            _, _, chat = heapq.heappop(self._throttled)
+            chat.waiting = False
+            self._schedule(chat)
+
+    def _prune(self, now: float):
+        """Forget idle chats whose bucket is full again: a new bucket would be the same"""
+        self._pruned_at = now
+        for chat_id, chat in list(self._chats.items()):
+            if not (chat.busy or chat.waiting or chat.lane is not None or chat.next_lane() is not None) \
+                    and chat.bucket.is_full(now):
+                del self._chats[chat_id]
+
+    def _next_chat(self) -> Optional[_Chat]:
+        for lane in LANES:
+            ready = self._ready[lane]
+            while ready:
+                chat = ready.popleft()
+                if chat.lane == lane:
+                    chat.lane = None
+                    return chat
+        return None
+
+    async def _sleep(self, seconds: Optional[float]):
+        """Sleep, waking early when a message is submitted or a send finishes"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            now = self._clock()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            if self._in_flight >= self.max_in_flight:
+                await self._sleep(None)
+                continue
+            delay = self._global.delay(now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            if now - self._pruned_at > PRUNE_INTERVAL:
+                self._prune(now)
+            self._release_throttled(now)
+            chat = self._next_chat()
+            if chat is None:
+                await self._sleep(self._throttled[0][0] - now if self._throttled else None)
+                continue
+
+            lane = chat.next_lane()
+            message = chat.lanes[lane].popleft()
+            if message.future.cancelled():
+                # The caller gave up on it, e.g. a stopped broadcast
+                self._done(lane)
+                self._schedule(chat)
+                continue
+            self._global.take(now)
+            chat.bucket.take(now)
+            chat.busy = True
+            self._in_flight += 1
+            task = asyncio.create_task(self._send(chat, lane, message))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, chat: _Chat, lane: int, message: _Message):
+        try:
+            result = await message.send()
+        except RetryAfter as e:
+            # Flood control: hold everything back, then send this message again first
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, self._clock() + _seconds(e.retry_after))
+            chat.lanes[lane].appendleft(message)
+            logger.warning(f"Telegram flood control, pausing sends for {_seconds(e.retry_after)}s")
+        except asyncio.CancelledError:
+            message.future.cancel()
+            raise
+        except Exception as e:
+            self._done(lane)
+            self.failed += 1
+            logger.error(f"Error sending to chat {chat.id}: {e}")
+            if not message.future.done():
+                message.future.set_exception(e)
+        else:
+            self._done(lane)
+            self.sent[lane] += 1
+            if not message.future.done():
+                message.future.set_result(result)
+        finally:
+            chat.busy = False
+            self._in_flight -= 1
+            self._schedule(chat)
+            self._wakeup.set()
+
+    def _done(self, lane: int):
+        self._queued[lane] -= 1
+        if not any(self._queued):
+            self._idle.set()
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait until every submitted message has been sent or has failed"""
+        await asyncio.wait_for(self._idle.wait(), timeout)
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Send what is queued (giving up after ``timeout`` seconds) and stop"""
+        try:
+            await self.drain(timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {sum(self._queued)} unsent messages")
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # Sends still running after the timeout are given up on as well
+        sending = list(self._sending)
+        for task in sending:
+            task.cancel()
+        await asyncio.gather(*sending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "queued": {LANE_NAMES[lane]: self._queued[lane] for lane in LANES},
+            "sent": {LANE_NAMES[lane]: self.sent[lane] for lane in LANES},
+            "in_flight": self._in_flight,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "paused_for": round(max(0.0, self._paused_until - self._clock()), 2),
+            "chats": len(self._chats),
+        }
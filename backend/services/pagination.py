@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, literal
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position into an opaque cursor string"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode an opaque cursor back into its (created_at, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def created_at_bound(session, created_at: datetime):
+    """Bind the cursor's created_at the same way the database stores it"""
+    if session.bind.dialect.name == "sqlite":
+        # SQLite keeps CURRENT_TIMESTAMP defaults as second-precision text, while a bound
+        # datetime is rendered with microseconds, so compare text against text instead.
+        return literal(created_at.isoformat(sep=" "))
+    return created_at
+
+
+def after_cursor(session, stmt, model, cursor: Optional[str] = None):
+    """Order ``stmt`` newest first by (created_at, id) and keep only the rows after ``cursor``"""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        created_at = created_at_bound(session, created_at)
+        stmt = stmt.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            )
+        )
+    return stmt.order_by(model.created_at.desc(), model.id.desc())
+
+
+async def paginate(session, stmt, model, schema, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    """Run a keyset-paginated select, newest first by (created_at, id).
+
+    Returns a tuple of (items, next_cursor). Only ``limit + 1`` rows are read,
+    so the cost of a page does not depend on how deep the cursor points.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    stmt = after_cursor(session, stmt, model, cursor).limit(limit + 1)
+    rows = (await session.execute(stmt)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [schema.model_validate(r) for r in rows], next_cursor
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Question bank import.
+
+Streams a JSONL or CSV file of questions (fields: part, question_text and the
+optional sample_answer and category) and upserts it in batches, keyed on the
+normalized question text. Importing the same file twice changes nothing, and
+memory use depends on the batch size rather than the file size.
+
+    python -m backend.services.question_import questions.jsonl [--format jsonl|csv] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import sys
+from typing import AsyncIterator, Iterable, Tuple
+
+from pydantic import ValidationError
+
+from backend.models.schemas.schemas import QuestionCreateSchema, QuestionImportResultSchema
+from backend.services.requests import question as rq
+from backend.services.text import text_hash
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 20
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines, keeping the line endings"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_file_chunks(path: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line number, record) pairs; a record that cannot be parsed is yielded as its exception"""
+    number = 0
+    if fmt == "jsonl":
+        async for line in lines:
+            number += 1
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, e
+        return
+
+    # CSV: a quoted field may span lines, so gather lines until the quotes balance
+    header = None
+    record, record_start = "", 0
+    async for line in lines:
+        number += 1
+        if not record:
+            record_start = number
+        record += line
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield record_start, dict(zip(header, values))
+    if record:
+        yield record_start, ValueError("Unterminated quoted field")
+
+
+def _validate(record: object) -> QuestionCreateSchema:
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Expected an object")
+    # Empty CSV cells mean "no value"
+    return QuestionCreateSchema.model_validate({key: value for key, value in record.items() if value != ""})
+
+
+async def import_questions(records: AsyncIterator[Tuple[int, object]],
+                           batch_size: int = IMPORT_BATCH_SIZE) -> QuestionImportResultSchema:
+    """Validate and upsert parsed records in batches; invalid and repeated rows are skipped"""
+    result = QuestionImportResultSchema()
+    batch = {}
+
+    async def flush():
+        inserted, updated, unchanged = await rq.upsert_questions(list(batch.values()))
+        result.inserted += inserted
+        result.updated += updated
+        result.skipped += unchanged
+        batch.clear()
+
+    async for number, record in records:
+        try:
+            question = _validate(record)
+        except (ValidationError, ValueError) as e:
+            result.skipped += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                reason = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+                result.errors.append(f"line {number}: {reason}")
+            continue
+
+        hashed = text_hash(question.question_text)
+        if hashed in batch:
+            # Repeated within the batch: the later row wins
+            result.skipped += 1
+        batch[hashed] = question
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+    return result
+
+
+def _detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def parse_args(argv: Iterable[str] = None):
+    parser = argparse.ArgumentParser(description="Import a JSONL or CSV question bank")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="File format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per upsert statement")
+    return parser.parse_args(argv)
+
+
+async def main() -> int:
+    args = parse_args()
+    import backend.models.tables  # noqa: F401  (register every table)
+    from backend.core.db.models import engine, init_db
+
+    await init_db()
+    await rq.backfill_text_hashes()
+    fmt = args.format or _detect_format(args.path)
+    result = await import_questions(iter_records(iter_lines(iter_file_chunks(args.path)), fmt), args.batch_size)
+    await engine.dispose()
+
+    print(f"Inserted {result.inserted}, updated {result.updated}, skipped {result.skipped}")
+    for error in result.errors:
+        print(f"  {error}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
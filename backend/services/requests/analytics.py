@@ -1,14 +1,19 @@
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, desc
 from backend.models.tables.user import User
-from backend.models.tables.user_response import UserResponse
+from backend.models.tables.user_score_rollup import UserScoreRollup
 from backend.models.tables.question import Question
 from backend.models.schemas.schemas import (
     QuestionSchema,
     UserScoreSchema, QuestionWithResponsesSchema
 )
 from typing import List, Optional
+from bisect import bisect_left, insort
+import asyncio
+import time
 from backend.services.conn import connection
 
+LEADERBOARD_TTL_SECONDS = 60
+
 
 
 
@@ -19,62 +24,41 @@ from backend.services.conn import connection
 from backend.services.requests.user_response import get_responses_by_question
 
 
+def _average(rollup: UserScoreRollup, field: str) -> Optional[float]:
+    count = getattr(rollup, f"{field}_count")
+    return getattr(rollup, f"{field}_sum") / count if count else None
+
+
 @connection
 async def get_user_scores(session, user_id: int) -> Optional[UserScoreSchema]:
-    """Get comprehensive user scores and statistics"""
-    user = await session.scalar(select(User).where(User.id == user_id))
-    if not user:
+    """Get comprehensive user scores and statistics from the user's score rollup"""
+    row = (await session.execute(
+        select(User.first_name, UserScoreRollup)
+        .outerjoin(UserScoreRollup, UserScoreRollup.user_id == User.id)
+        .where(User.id == user_id)
+    )).first()
+    if not row:
         return None
 
-    # Get all responses for the user
-    result = await session.execute(
-        select(UserResponse).where(UserResponse.user_id == user_id).order_by(UserResponse.created_at.desc())
-    )
-    responses = result.scalars().all()
-
-    if not responses:
+    first_name, rollup = row
+    if rollup is None or not rollup.response_count:
         return UserScoreSchema(
             user_id=user_id,
-            first_name=user.first_name,
+            first_name=first_name,
             total_responses=0
         )
 
-    # Calculate statistics
-    total_responses = len(responses)
-    scores_with_values = [r for r in responses if r.overall_score is not None]
-
-    if scores_with_values:
-        average_overall_score = sum(r.overall_score for r in scores_with_values) / len(scores_with_values)
-        average_fluency_score = sum(r.fluency_score for r in scores_with_values if r.fluency_score) / len(
-            scores_with_values)
-        average_pronunciation_score = sum(
-            r.pronunciation_score for r in scores_with_values if r.pronunciation_score) / len(scores_with_values)
-        average_grammar_score = sum(r.grammar_score for r in scores_with_values if r.grammar_score) / len(
-            scores_with_values)
-        average_vocabulary_score = sum(r.vocabulary_score for r in scores_with_values if r.vocabulary_score) / len(
-            scores_with_values)
-        best_score = max(r.overall_score for r in scores_with_values)
-        recent_scores = [r.overall_score for r in responses[:5] if r.overall_score is not None]
-    else:
-        average_overall_score = None
-        average_fluency_score = None
-        average_pronunciation_score = None
-        average_grammar_score = None
-        average_vocabulary_score = None
-        best_score = None
-        recent_scores = []
-
     return UserScoreSchema(
         user_id=user_id,
-        first_name=user.first_name,
-        total_responses=total_responses,
-        average_overall_score=average_overall_score,
-        average_fluency_score=average_fluency_score,
-        average_pronunciation_score=average_pronunciation_score,
-        average_grammar_score=average_grammar_score,
-        average_vocabulary_score=average_vocabulary_score,
-        best_score=best_score,
-        recent_scores=recent_scores
+        first_name=first_name,
+        total_responses=rollup.response_count,
+        average_overall_score=_average(rollup, "overall"),
+        average_fluency_score=_average(rollup, "fluency"),
+        average_pronunciation_score=_average(rollup, "pronunciation"),
+        average_grammar_score=_average(rollup, "grammar"),
+        average_vocabulary_score=_average(rollup, "vocabulary"),
+        best_score=rollup.best_score,
+        recent_scores=[score for _, score in rollup.recent_scores if score is not None]
     )
 
 
@@ -85,7 +69,7 @@ async def get_question_with_responses(session, question_id: int) -> Optional[Que
     if not question:
         return None
 
-    responses = await get_responses_by_question(session, question_id)
+    responses = await get_responses_by_question(question_id, session=session)
 
     return QuestionWithResponsesSchema(
         question=QuestionSchema.model_validate(question),
@@ -97,18 +81,17 @@ async def get_question_with_responses(session, question_id: int) -> Optional[Que
 @connection
 async def get_leaderboard(session, limit: int = 10) -> List[UserScoreSchema]:
     """Get leaderboard of users by average score"""
-    # Get all users with their average scores
+    average_score = (UserScoreRollup.overall_sum / UserScoreRollup.overall_count).label("average_score")
     result = await session.execute(
         select(
             User.id,
             User.first_name,
-            func.count(UserResponse.id).label('total_responses'),
-            func.avg(UserResponse.overall_score).label('average_score')
+            UserScoreRollup.response_count.label("total_responses"),
+            average_score,
         )
-        .outerjoin(UserResponse, User.id == UserResponse.user_id)
-        .group_by(User.id, User.first_name)
-        .having(func.avg(UserResponse.overall_score).isnot(None))
-        .order_by(desc(func.avg(UserResponse.overall_score)))
+        .join(UserScoreRollup, UserScoreRollup.user_id == User.id)
+        .where(UserScoreRollup.overall_count > 0)
+        .order_by(desc(average_score))
         .limit(limit)
     )
 
@@ -118,7 +101,76 @@ async def get_leaderboard(session, limit: int = 10) -> List[UserScoreSchema]:
             user_id=row.id,
             first_name=row.first_name,
             total_responses=row.total_responses,
-            average_overall_score=float(row.average_score) if row.average_score else None
+            average_overall_score=float(row.average_score) if row.average_score is not None else None
         ))
 
     return leaderboard
+
+
+class LeaderboardCache:
+    """Per-user overall averages kept sorted best-first in memory.
+
+    Response writes update it in place (write-through), and it is reloaded from
+    the score rollups at most every ``ttl`` seconds, which bounds how stale it can
+    get when another process writes or a user is renamed.
+    """
+
+    def __init__(self, ttl: float = LEADERBOARD_TTL_SECONDS):
+        self.ttl = ttl
+        self._ranking = []  # sorted (-average_score, user_id)
+        self._entries = {}  # user_id -> UserScoreSchema
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def record(self, user_id: int, total_responses: int, average_score: Optional[float],
+               first_name: Optional[str] = None):
+        """Apply a user's new rollup after a committed response write"""
+        if self._loaded_at is None:
+            return
+
+        entry = self._entries.pop(user_id, None)
+        if entry:
+            self._ranking.pop(bisect_left(self._ranking, (-entry.average_overall_score, user_id)))
+        if average_score is None:
+            return
+
+        first_name = first_name or (entry and entry.first_name)
+        if not first_name:
+            # Unknown user and no name to show; let the next read reload everything
+            self.invalidate()
+            return
+
+        self._entries[user_id] = UserScoreSchema(
+            user_id=user_id,
+            first_name=first_name,
+            total_responses=total_responses,
+            average_overall_score=average_score
+        )
+        insort(self._ranking, (-average_score, user_id))
+
+    async def top(self, limit: int = 10) -> List[UserScoreSchema]:
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self._reload()
+        return [self._entries[user_id] for _, user_id in self._ranking[:limit]]
+
+    async def _reload(self):
+        leaderboard = await get_leaderboard(limit=None)
+        self._entries = {entry.user_id: entry for entry in leaderboard}
+        self._ranking = sorted((-entry.average_overall_score, entry.user_id) for entry in leaderboard)
+        self._loaded_at = time.monotonic()
+
+
+leaderboard_cache = LeaderboardCache()
+
+
+async def get_cached_leaderboard(limit: int = 10) -> List[UserScoreSchema]:
+    """Get leaderboard of users by average score, served from memory"""
+    return await leaderboard_cache.top(limit)
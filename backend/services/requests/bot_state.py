@@ -0,0 +1,43 @@
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import select, delete, func
+
+from backend.models.tables.bot_state import BotState
+from backend.services.conn import connection, dialect_insert
+
+
+@connection
+async def get_bot_state(session, tg_id: int) -> Tuple[Optional[dict], int]:
+    """A user's state and its version, or (None, 0) if none was saved yet"""
+    row = (await session.execute(select(BotState.data, BotState.version).where(BotState.tg_id == tg_id))).first()
+    if row is None:
+        return None, 0
+    return row.data, row.version or 0
+
+
+@connection
+async def save_bot_states(session, states: Dict[int, Tuple[dict, int]]) -> Set[int]:
+    """Upsert the state of many users in one statement, each only if it is still at the version it was read at.
+
+    ``states`` maps tg_id to (data, version read); returns the tg_ids that were written.
+    """
+    if not states:
+        return set()
+    insert = dialect_insert(session)
+    stmt = insert(BotState).values([
+        {"tg_id": tg_id, "data": data, "version": version + 1} for tg_id, (data, version) in states.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BotState.tg_id],
+        set_={"data": stmt.excluded.data, "version": stmt.excluded.version, "updated_at": func.now()},
+        where=func.coalesce(BotState.version, 0) == stmt.excluded.version - 1,
+    ).returning(BotState.tg_id)
+    written = set((await session.scalars(stmt)).all())
+    await session.commit()
+    return written
+
+
+@connection
+async def delete_bot_state(session, tg_id: int) -> None:
+    await session.execute(delete(BotState).where(BotState.tg_id == tg_id))
+    await session.commit()
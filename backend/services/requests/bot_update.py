@@ -0,0 +1,70 @@
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update, delete, func, or_, and_, exists
+from sqlalchemy.orm import aliased
+
+from backend.models.tables.bot_update import BotUpdate
+from backend.services.conn import connection, dialect_insert
+from backend.services.requests.scoring_job import utcnow
+
+PENDING, RUNNING = "pending", "running"
+
+
+@connection
+async def add_update(session, update_id: int, chat_id: Optional[int], data: dict) -> bool:
+    """Store an update for the bot processes; False if Telegram sent it before"""
+    result = await session.execute(
+        dialect_insert(session)(BotUpdate)
+        .values(update_id=update_id, chat_id=chat_id, data=data, status=PENDING)
+        .on_conflict_do_nothing(index_elements=["update_id"])
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+@connection
+async def lease_updates(session, limit: int, lease_seconds: int) -> List[BotUpdate]:
+    """Claim the oldest update of up to ``limit`` chats that no process is handling.
+
+    An update whose lease expired is claimed again before anything newer of its chat.
+    A claim re-checks the status of the row, so concurrent processes never take the
+    same update, and a chat is only claimed while none of its updates is held.
+    """
+    now = utcnow()
+    held = aliased(BotUpdate)
+    claimable = or_(BotUpdate.status == PENDING, and_(BotUpdate.status == RUNNING, BotUpdate.leased_until < now))
+    oldest = (
+        select(func.min(BotUpdate.update_id))
+        .where(claimable)
+        .where(~exists().where(held.chat_id == BotUpdate.chat_id, held.status == RUNNING, held.leased_until >= now))
+        .group_by(BotUpdate.chat_id)
+        .order_by(func.min(BotUpdate.update_id))
+        .limit(limit)
+    )
+    result = await session.scalars(
+        update(BotUpdate)
+        .where(BotUpdate.update_id.in_(oldest.scalar_subquery()), claimable)
+        .values(
+            status=RUNNING,
+            attempts=BotUpdate.attempts + 1,
+            leased_until=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(BotUpdate)
+        .execution_options(synchronize_session=False)
+    )
+    updates = result.all()
+    await session.commit()
+    return updates
+
+
+@connection
+async def complete_update(session, update_id: int, attempt: int) -> bool:
+    """Delete a handled update; False if its lease had expired and another process took it"""
+    result = await session.execute(
+        delete(BotUpdate)
+        .where(BotUpdate.update_id == update_id, BotUpdate.status == RUNNING, BotUpdate.attempts == attempt)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
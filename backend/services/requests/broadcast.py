@@ -0,0 +1,123 @@
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update, or_, and_, exists
+from sqlalchemy.orm import aliased
+
+from backend.models.tables.broadcast import Broadcast
+from backend.models.tables.user import User
+from backend.models.tables.user_score_rollup import UserScoreRollup
+from backend.models.schemas.schemas import BroadcastSchema, PageSchema
+from backend.services.conn import connection
+from backend.services.pagination import after_cursor, encode_cursor, paginate, DEFAULT_PAGE_SIZE
+from backend.services.requests.scoring_job import utcnow
+
+RUNNING, DONE, CANCELLED = "running", "done", "cancelled"
+
+
+@connection
+async def create_broadcast(session, kind: str) -> BroadcastSchema:
+    broadcast = Broadcast(kind=kind, status=RUNNING)
+    session.add(broadcast)
+    await session.commit()
+    await session.refresh(broadcast)
+    return BroadcastSchema.model_validate(broadcast)
+
+
+@connection
+async def get_broadcast(session, broadcast_id: int) -> Optional[BroadcastSchema]:
+    broadcast = await session.get(Broadcast, broadcast_id)
+    return BroadcastSchema.model_validate(broadcast) if broadcast else None
+
+
+@connection
+async def get_broadcasts(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[BroadcastSchema]:
+    """Get one page of broadcasts, newest first"""
+    items, next_cursor = await paginate(session, select(Broadcast), Broadcast, BroadcastSchema, limit, cursor)
+    return PageSchema[BroadcastSchema](items=items, next_cursor=next_cursor)
+
+
+@connection
+async def cancel_broadcast(session, broadcast_id: int) -> Optional[BroadcastSchema]:
+    """Stop a running broadcast; its runner notices at its next checkpoint"""
+    broadcast = await session.get(Broadcast, broadcast_id)
+    if not broadcast:
+        return None
+    if broadcast.status == RUNNING:
+        broadcast.status = CANCELLED
+        broadcast.finished_at = utcnow()
+        await session.commit()
+        await session.refresh(broadcast)
+    return BroadcastSchema.model_validate(broadcast)
+
+
+@connection
+async def claim_broadcast(session, lease_seconds: int) -> Optional[Broadcast]:
+    """Take over a running broadcast that no runner holds, locked with SKIP LOCKED like scoring jobs.
+
+    Nothing is claimed while another broadcast is held: they would share the bot's send rate.
+    """
+    now = utcnow()
+    held = aliased(Broadcast)
+    free = (
+        select(Broadcast.id)
+        .where(Broadcast.status == RUNNING)
+        .where(or_(Broadcast.leased_until.is_(None), Broadcast.leased_until < now))
+        .where(~exists().where(held.status == RUNNING, held.leased_until >= now))
+        .order_by(Broadcast.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    broadcast = await session.scalar(
+        update(Broadcast)
+        .where(Broadcast.id.in_(free.scalar_subquery()))
+        .values(lease=Broadcast.lease + 1, leased_until=now + timedelta(seconds=lease_seconds))
+        .returning(Broadcast)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return broadcast
+
+
+@connection
+async def save_progress(session, broadcast_id: int, lease: int, cursor: str, sent: int, failed: int,
+                        finished: bool, lease_seconds: int) -> bool:
+    """Checkpoint a page and renew the lease; False if the broadcast was cancelled or taken over"""
+    now = utcnow()
+    values = dict(
+        cursor=cursor,
+        sent=Broadcast.sent + sent,
+        failed=Broadcast.failed + failed,
+        leased_until=now + timedelta(seconds=lease_seconds),
+    )
+    if finished:
+        values.update(status=DONE, finished_at=now, leased_until=None)
+    result = await session.execute(
+        update(Broadcast)
+        .where(and_(Broadcast.id == broadcast_id, Broadcast.lease == lease, Broadcast.status == RUNNING))
+        .values(**values)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+@connection
+async def get_recipients(session, limit: int, cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """One page of users with their score rollup (None before their first answer), newest first.
+
+    Returns the rows and the cursor of the last one, or None for the last page.
+    """
+    stmt = (
+        select(User.id, User.tg_id, User.first_name, User.created_at, UserScoreRollup)
+        .outerjoin(UserScoreRollup, UserScoreRollup.user_id == User.id)
+    )
+    rows = (await session.execute(after_cursor(session, stmt, User, cursor).limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, None
+
+
+def position(row) -> str:
+    """Cursor pointing just after a recipient row"""
+    return encode_cursor(row.created_at, row.id)
@@ -6,10 +6,11 @@ from backend.models.tables.user import User
 
 from backend.models.schemas.schemas import (
     FeedbackCreateSchema,
-    FeedbackSchema, FeedbackUpdateSchema
+    FeedbackSchema, FeedbackUpdateSchema, PageSchema
 )
 from typing import List, Optional
 from backend.services.conn import connection
+from backend.services.pagination import paginate, DEFAULT_PAGE_SIZE
 
 
 # Feedback CRUD Operations
@@ -44,12 +45,11 @@ async def get_feedback(session, feedback_id: int) -> Optional[FeedbackSchema]:
 
 
 @connection
-async def get_all_feedbacks(session) -> List[FeedbackSchema]:
-    """Get all questions"""
-    result = await session.execute(select(Feedback).order_by(Feedback.ai_comment, Feedback.id))
-    feedbacks = result.scalars().all()
-    return [FeedbackSchema.model_validate(f) for f in feedbacks]
-
+async def get_all_feedbacks(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[
+    FeedbackSchema]:
+    """Get one page of feedbacks, newest first"""
+    items, next_cursor = await paginate(session, select(Feedback), Feedback, FeedbackSchema, limit, cursor)
+    return PageSchema[FeedbackSchema](items=items, next_cursor=next_cursor)
 
 
 @connection
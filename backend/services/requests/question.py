@@ -1,11 +1,20 @@
-from sqlalchemy import select
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from backend.models.tables.question import Question
 from backend.models.schemas.schemas import (
-QuestionSchema, QuestionCreateSchema, QuestionUpdateSchema, QuestionWithResponsesSchema
+QuestionSchema, QuestionCreateSchema, QuestionUpdateSchema, PageSchema
 )
-from typing import List, Optional
-from backend.services.conn import connection
+from typing import List, Optional, Tuple
+import asyncio
+import random
+import time
+from backend.services.conn import connection, after_commit, dialect_insert
+from backend.services.text import text_hash
+from backend.services.pagination import paginate, DEFAULT_PAGE_SIZE
+
+CATALOG_TTL_SECONDS = 300
+BACKFILL_BATCH_SIZE = 1000
 
 
 
@@ -17,11 +26,15 @@ from backend.services.conn import connection
 async def create_question(session, question_data: QuestionCreateSchema) -> QuestionSchema:
     """Create a new question"""
     try:
-        new_question = Question(**question_data.model_dump())
+        new_question = Question(**question_data.model_dump(), text_hash=text_hash(question_data.question_text))
         session.add(new_question)
         await session.commit()
+        after_commit(session, question_catalog.invalidate)
         await session.refresh(new_question)
         return QuestionSchema.model_validate(new_question)
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="A question with the same text already exists")
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating question: {str(e)}")
@@ -37,11 +50,11 @@ async def get_question(session, question_id: int) -> Optional[QuestionSchema]:
 
 
 @connection
-async def get_all_questions(session) -> List[QuestionSchema]:
-    """Get all questions"""
-    result = await session.execute(select(Question).order_by(Question.part, Question.id))
-    questions = result.scalars().all()
-    return [QuestionSchema.model_validate(q) for q in questions]
+async def get_all_questions(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[
+    QuestionSchema]:
+    """Get one page of questions, newest first"""
+    items, next_cursor = await paginate(session, select(Question), Question, QuestionSchema, limit, cursor)
+    return PageSchema[QuestionSchema](items=items, next_cursor=next_cursor)
 
 
 @connection
@@ -68,10 +81,17 @@ async def update_question(session, question_id: int, question_data: QuestionUpda
         return None
 
     update_data = question_data.model_dump(exclude_unset=True)
+    if update_data.get("question_text"):
+        update_data["text_hash"] = text_hash(update_data["question_text"])
     for field, value in update_data.items():
         setattr(question, field, value)
 
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="A question with the same text already exists")
+    after_commit(session, question_catalog.invalidate)
     await session.refresh(question)
     return QuestionSchema.model_validate(question)
 
@@ -85,4 +105,140 @@ async def delete_question(session, question_id: int) -> bool:
 
     await session.delete(question)
     await session.commit()
+    after_commit(session, question_catalog.invalidate)
     return True
+
+
+@connection
+async def backfill_text_hashes(session) -> int:
+    """Fill text_hash for questions created before it existed; returns the number filled.
+
+    Run at startup after init_db, like a migration.
+
+    A question whose normalized text is already taken by another row keeps a NULL
+    hash, so the unique index still holds.
+    """
+    filled = 0
+    last_id = 0
+    while True:
+        rows = (await session.execute(
+            select(Question.id, Question.question_text)
+            .where(Question.text_hash.is_(None), Question.id > last_id)
+            .order_by(Question.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        )).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        hashes = {}
+        for row in rows:
+            hashes.setdefault(text_hash(row.question_text), row.id)
+        taken = set((await session.scalars(select(Question.text_hash).where(Question.text_hash.in_(hashes)))).all())
+        updates = [{"id": row_id, "text_hash": hashed} for hashed, row_id in hashes.items() if hashed not in taken]
+        if updates:
+            await session.execute(update(Question), updates)
+            filled += len(updates)
+    await session.commit()
+    return filled
+
+
+@connection
+async def upsert_questions(session, questions: List[QuestionCreateSchema]) -> Tuple[int, int, int]:
+    """Insert or update a batch of questions keyed on their normalized text.
+
+    Returns (inserted, updated, unchanged). The batch must not repeat a text hash.
+    Rows whose part, sample answer and category already match are left alone.
+    """
+    rows = [{**question.model_dump(), "text_hash": text_hash(question.question_text)} for question in questions]
+    hashes = [row["text_hash"] for row in rows]
+    existing = set((await session.scalars(select(Question.text_hash).where(Question.text_hash.in_(hashes)))).all())
+
+    stmt = dialect_insert(session)(Question).values(rows)
+    changed = [
+        getattr(Question, field).is_distinct_from(stmt.excluded[field])
+        for field in ("part", "sample_answer", "category")
+    ]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Question.text_hash],
+        set_={field: stmt.excluded[field] for field in ("part", "sample_answer", "category")},
+        where=or_(*changed),
+    ).returning(Question.text_hash)
+    written = set((await session.scalars(stmt)).all())
+    await session.commit()
+    if written:
+        after_commit(session, question_catalog.invalidate)
+
+    inserted = len(written - existing)
+    updated = len(written & existing)
+    return inserted, updated, len(rows) - inserted - updated
+
+
+@connection
+async def _load_all_questions(session) -> List[QuestionSchema]:
+    result = await session.execute(select(Question).order_by(Question.id))
+    return [QuestionSchema.model_validate(q) for q in result.scalars().all()]
+
+
+class QuestionCatalog:
+    """Process-local copy of the question bank, indexed by part and category.
+
+    Loaded on first use and dropped whenever the question CRUD functions write.
+    It is also reloaded after ``ttl`` seconds so that processes which do not see
+    those writes (such as the bot) pick them up.
+    """
+
+    def __init__(self, ttl: float = CATALOG_TTL_SECONDS):
+        self.ttl = ttl
+        self._all: List[QuestionSchema] = []
+        self._by_id = {}
+        self._by_part = {}
+        self._by_category = {}
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    async def _ensure_loaded(self):
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    questions = await _load_all_questions()
+                    by_part, by_category = {}, {}
+                    for question in questions:
+                        by_part.setdefault(question.part, []).append(question)
+                        if question.category:
+                            by_category.setdefault(question.category, []).append(question)
+                    self._all, self._by_part, self._by_category = questions, by_part, by_category
+                    self._by_id = {question.id: question for question in questions}
+                    self._loaded_at = time.monotonic()
+
+    async def questions(self, part: Optional[int] = None, category: Optional[str] = None) -> List[QuestionSchema]:
+        await self._ensure_loaded()
+        if part is not None and category is not None:
+            return [q for q in self._by_part.get(part, []) if q.category == category]
+        if part is not None:
+            return self._by_part.get(part, [])
+        if category is not None:
+            return self._by_category.get(category, [])
+        return self._all
+
+    async def get(self, question_id: int) -> Optional[QuestionSchema]:
+        await self._ensure_loaded()
+        return self._by_id.get(question_id)
+
+    async def random(self, part: Optional[int] = None, category: Optional[str] = None) -> Optional[QuestionSchema]:
+        questions = await self.questions(part, category)
+        return random.choice(questions) if questions else None
+
+
+question_catalog = QuestionCatalog()
+
+
+async def get_random_question(part: Optional[int] = None, category: Optional[str] = None) -> Optional[QuestionSchema]:
+    """Get a random question, optionally of one part and/or category, from the in-memory catalog"""
+    return await question_catalog.random(part, category)
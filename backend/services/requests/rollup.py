@@ -0,0 +1,213 @@
+import asyncio
+from itertools import groupby
+from typing import List, Optional
+
+from sqlalchemy import select, func, delete, insert, update, exists
+
+from backend.models.tables.user_response import UserResponse
+from backend.models.tables.user_score_rollup import UserScoreRollup
+from backend.core.db.models import engine
+from backend.services.conn import connection, dialect_insert
+
+SCORE_FIELDS = ("overall", "fluency", "pronunciation", "grammar", "vocabulary")
+RECENT_SCORES_SIZE = 5
+
+
+def score_snapshot(response: UserResponse) -> dict:
+    """Capture the rollup-relevant columns of a response before it changes"""
+    return {
+        "id": response.id,
+        "user_id": response.user_id,
+        **{f"{field}_score": getattr(response, f"{field}_score") for field in SCORE_FIELDS},
+    }
+
+
+async def _locked_rollup(session, user_id: int) -> UserScoreRollup:
+    """Fetch the user's rollup row for update, creating it first if needed"""
+    await session.execute(
+        dialect_insert(session)(UserScoreRollup)
+        .values(user_id=user_id, recent_scores=[])
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    return await session.scalar(
+        select(UserScoreRollup).where(UserScoreRollup.user_id == user_id).with_for_update()
+    )
+
+
+async def _recent_scores(session, user_id: int) -> list:
+    result = await session.execute(
+        select(UserResponse.id, UserResponse.overall_score)
+        .where(UserResponse.user_id == user_id)
+        .order_by(UserResponse.created_at.desc(), UserResponse.id.desc())
+        .limit(RECENT_SCORES_SIZE)
+    )
+    return [[row.id, row.overall_score] for row in result]
+
+
+async def record_response_change(session, before: Optional[dict], after: Optional[dict]) -> UserScoreRollup:
+    """Apply a response create (before=None), update or delete (after=None) to the rollup.
+
+    Must run in the caller's transaction after the change has been flushed, so the
+    rollup commits or rolls back together with the response itself.
+    """
+    user_id = (after or before)["user_id"]
+    rollup = await _locked_rollup(session, user_id)
+
+    rollup.response_count += (after is not None) - (before is not None)
+    for field in SCORE_FIELDS:
+        old = before and before[f"{field}_score"]
+        new = after and after[f"{field}_score"]
+        count, total = getattr(rollup, f"{field}_count"), getattr(rollup, f"{field}_sum")
+        if old is not None:
+            count, total = count - 1, total - old
+        if new is not None:
+            count, total = count + 1, total + new
+        setattr(rollup, f"{field}_count", count)
+        setattr(rollup, f"{field}_sum", total if count else 0.0)
+
+    old_best = before and before["overall_score"]
+    new_best = after and after["overall_score"]
+    if old_best is not None and old_best == rollup.best_score and (new_best is None or new_best < old_best):
+        # The best score went away, so ask the database for the runner-up
+        rollup.best_score = await session.scalar(
+            select(func.max(UserResponse.overall_score)).where(UserResponse.user_id == user_id)
+        )
+    elif new_best is not None and (rollup.best_score is None or new_best > rollup.best_score):
+        rollup.best_score = new_best
+
+    recent = list(rollup.recent_scores or [])
+    if before is None:
+        recent = ([[after["id"], after["overall_score"]]] + recent)[:RECENT_SCORES_SIZE]
+    elif after is None:
+        if any(response_id == before["id"] for response_id, _ in recent):
+            recent = await _recent_scores(session, user_id)
+    else:
+        recent = [[response_id, after["overall_score"] if response_id == after["id"] else score]
+                  for response_id, score in recent]
+    rollup.recent_scores = recent
+    return rollup
+
+
+def _aggregates() -> List[tuple]:
+    """(rollup column, aggregate over user_responses) pairs, grouped by user"""
+    pairs = [
+        (UserScoreRollup.user_id, UserResponse.user_id),
+        (UserScoreRollup.response_count, func.count(UserResponse.id)),
+        (UserScoreRollup.best_score, func.max(UserResponse.overall_score)),
+    ]
+    for field in SCORE_FIELDS:
+        score = getattr(UserResponse, f"{field}_score")
+        pairs += [
+            (getattr(UserScoreRollup, f"{field}_count"), func.count(score)),
+            (getattr(UserScoreRollup, f"{field}_sum"), func.coalesce(func.sum(score), 0.0)),
+        ]
+    return pairs
+
+
+async def _recent_rings(session, user_ids: Optional[List[int]] = None) -> List[dict]:
+    """Each user's most recent scores in one windowed query, as rollup update rows"""
+    ranked = select(
+        UserResponse.user_id,
+        UserResponse.id,
+        UserResponse.overall_score,
+        func.row_number().over(
+            partition_by=UserResponse.user_id,
+            order_by=(UserResponse.created_at.desc(), UserResponse.id.desc()),
+        ).label("rn"),
+    )
+    if user_ids is not None:
+        ranked = ranked.where(UserResponse.user_id.in_(user_ids))
+    ranked = ranked.subquery()
+
+    result = await session.execute(
+        select(ranked).where(ranked.c.rn <= RECENT_SCORES_SIZE).order_by(ranked.c.user_id, ranked.c.rn)
+    )
+    return [
+        {"user_id": user_id, "recent_scores": [[row.id, row.overall_score] for row in rows]}
+        for user_id, rows in groupby(result, key=lambda row: row.user_id)
+    ]
+
+
+@connection
+async def rebuild_rollups(session) -> int:
+    """Recompute every user's rollup from user_responses; returns the number of rollups written"""
+    await session.execute(delete(UserScoreRollup))
+
+    # recent_scores starts empty and is filled from the windowed query below
+    pairs = _aggregates() + [
+        (UserScoreRollup.recent_scores,
+         func.json_array() if session.bind.dialect.name == "sqlite" else func.json_build_array()),
+    ]
+    await session.execute(
+        insert(UserScoreRollup).from_select(
+            [column.key for column, _ in pairs],
+            select(*(aggregate for _, aggregate in pairs)).group_by(UserResponse.user_id),
+        )
+    )
+
+    rings = await _recent_rings(session)
+    if rings:
+        await session.execute(update(UserScoreRollup), rings)
+
+    await session.commit()
+    return len(rings)
+
+
+@connection
+async def backfill_rollups(session) -> int:
+    """Rebuild the rollups if some user with responses has none, e.g. on a database created before them.
+
+    Run at startup after init_db, like a migration; returns the number of rollups written.
+    """
+    missing = await session.scalar(
+        select(UserResponse.id)
+        .where(~exists().where(UserScoreRollup.user_id == UserResponse.user_id))
+        .limit(1)
+    )
+    if missing is None:
+        return 0
+    return await rebuild_rollups(session=session)
+
+
+async def refresh_user_rollups(session, user_ids: List[int]):
+    """Recompute the rollups of some users after a bulk write, in the caller's transaction.
+
+    The rows are locked first, in user_id order, so concurrent single-row writes
+    wait for the refresh instead of applying their change to a stale total.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    await session.execute(
+        dialect_insert(session)(UserScoreRollup)
+        .values([{"user_id": user_id, "recent_scores": []} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    await session.execute(
+        select(UserScoreRollup.user_id)
+        .where(UserScoreRollup.user_id.in_(user_ids))
+        .order_by(UserScoreRollup.user_id)
+        .with_for_update()
+    )
+
+    result = await session.execute(
+        select(*(aggregate.label(column.key) for column, aggregate in _aggregates()))
+        .where(UserResponse.user_id.in_(user_ids))
+        .group_by(UserResponse.user_id)
+    )
+    rows = {row.user_id: dict(row._mapping) for row in result}
+    for ring in await _recent_rings(session, user_ids):
+        rows[ring["user_id"]]["recent_scores"] = ring["recent_scores"]
+    if rows:
+        await session.execute(update(UserScoreRollup), list(rows.values()))
+
+
+async def main():
+    import backend.models.tables  # noqa: F401  (register every table before rebuilding)
+    count = await rebuild_rollups()
+    await engine.dispose()
+    print(f"Rebuilt {count} user score rollups")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
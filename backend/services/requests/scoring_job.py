@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update, func, or_, and_
+
+from backend.core.config import settings
+from backend.models.tables.question import Question
+from backend.models.tables.scoring_job import ScoringJob
+from backend.models.tables.user_response import UserResponse
+from backend.models.schemas.schemas import ScoringJobSchema, ScoringQueueSchema, ScoreRequests
+from backend.services.conn import connection
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+def utcnow() -> datetime:
+    # Queue timestamps are naive UTC set from Python, so every backend compares them the same way
+    return datetime.utcnow()
+
+
+def enqueue(session, response_id: int):
+    """Add a scoring job for a response to the caller's transaction"""
+    session.add(ScoringJob(response_id=response_id, status=PENDING, run_after=utcnow()))
+
+
+@connection
+async def lease_jobs(session, limit: int = 1, lease_seconds: Optional[int] = None) -> List[ScoringJob]:
+    """Claim up to ``limit`` due jobs for this worker.
+
+    Pending jobs that are due, and running jobs whose lease has expired, are
+    locked with SKIP LOCKED so concurrent workers never claim the same job.
+    Each claim bumps ``attempts``, which later acts as the lease token.
+    """
+    now = utcnow()
+    due = (
+        select(ScoringJob.id)
+        .where(or_(
+            and_(ScoringJob.status == PENDING, ScoringJob.run_after <= now),
+            and_(ScoringJob.status == RUNNING, ScoringJob.leased_until < now),
+        ))
+        .order_by(ScoringJob.run_after, ScoringJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.scalars(
+        update(ScoringJob)
+        .where(ScoringJob.id.in_(due.scalar_subquery()))
+        .values(
+            status=RUNNING,
+            attempts=ScoringJob.attempts + 1,
+            leased_until=now + timedelta(seconds=lease_seconds or settings.SCORING_LEASE_SECONDS),
+        )
+        .returning(ScoringJob)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = result.all()
+    await session.commit()
+    return jobs
+
+
+@connection
+async def get_score_request(session, response_id: int) -> Optional[ScoreRequests]:
+    """Build the AI scoring request for a stored response"""
+    row = (await session.execute(
+        select(Question.question_text, Question.part, UserResponse.response_text)
+        .join(UserResponse, UserResponse.question_id == Question.id)
+        .where(UserResponse.id == response_id)
+    )).first()
+    if not row:
+        return None
+    return ScoreRequests(question=row.question_text, answer=row.response_text, part=row.part)
+
+
+@connection
+async def complete_job(session, job_id: int, attempt: int) -> bool:
+    """Mark a leased job done; False if the lease was lost to another worker"""
+    result = await session.execute(
+        update(ScoringJob)
+        .where(ScoringJob.id == job_id, ScoringJob.status == RUNNING, ScoringJob.attempts == attempt)
+        .values(status=DONE, leased_until=None, last_error=None)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+@connection
+async def fail_job(session, job_id: int, attempt: int, error: str, retry: bool = True) -> Optional[str]:
+    """Record a failed attempt: retry later with backoff, or give up after the last attempt (or right away)"""
+    if not retry or attempt >= settings.SCORING_MAX_ATTEMPTS:
+        values = {"status": FAILED}
+    else:
+        delay = settings.SCORING_RETRY_DELAY * 2 ** (attempt - 1)
+        values = {"status": PENDING, "run_after": utcnow() + timedelta(seconds=delay)}
+
+    result = await session.execute(
+        update(ScoringJob)
+        .where(ScoringJob.id == job_id, ScoringJob.status == RUNNING, ScoringJob.attempts == attempt)
+        .values(leased_until=None, last_error=error[:2000], **values)
+    )
+    await session.commit()
+    return values["status"] if result.rowcount == 1 else None
+
+
+@connection
+async def defer_job(session, job_id: int, attempt: int, delay: float, error: str) -> bool:
+    """Put a leased job back for later without using up the attempt; False if the lease was lost"""
+    result = await session.execute(
+        update(ScoringJob)
+        .where(ScoringJob.id == job_id, ScoringJob.status == RUNNING, ScoringJob.attempts == attempt)
+        .values(
+            status=PENDING,
+            attempts=ScoringJob.attempts - 1,
+            run_after=utcnow() + timedelta(seconds=delay),
+            leased_until=None,
+            last_error=error[:2000],
+        )
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+@connection
+async def get_job(session, job_id: int) -> Optional[ScoringJobSchema]:
+    """Get scoring job by ID"""
+    job = await session.scalar(select(ScoringJob).where(ScoringJob.id == job_id))
+    return ScoringJobSchema.model_validate(job) if job else None
+
+
+@connection
+async def get_job_by_response(session, response_id: int) -> Optional[ScoringJobSchema]:
+    """Get the scoring job of a user response"""
+    job = await session.scalar(select(ScoringJob).where(ScoringJob.response_id == response_id))
+    return ScoringJobSchema.model_validate(job) if job else None
+
+
+@connection
+async def get_queue_stats(session) -> ScoringQueueSchema:
+    """Count jobs in each state"""
+    result = await session.execute(select(ScoringJob.status, func.count(ScoringJob.id)).group_by(ScoringJob.status))
+    return ScoringQueueSchema(**{status: count for status, count in result})
@@ -1,77 +1,33 @@
 from sqlalchemy import select
 from backend.models.tables.feedback import Feedback
-from backend.models.tables.user import User
+from backend.models.schemas.schemas import (UserSchema, UserResponseSchema, FeedbackSchema, PageSchema)
 
-from backend.models.schemas.schemas import (UserSchema, UserResponseSchema, FeedbackSchema)
-
-from typing import List
+from typing import Optional
 
 from backend.models.tables.user_response import UserResponse
 from backend.services.conn import connection
+from backend.services.pagination import paginate, DEFAULT_PAGE_SIZE
+from backend.services.requests.user import upsert_user
 
 
 @connection
-async def get_all_responses(session) -> List[UserResponseSchema]:
-    """Get all user responses"""
-    result = await session.execute(
-        select(UserResponse).order_by(UserResponse.created_at.desc())
-    )
-    responses = result.scalars().all()
-    return [UserResponseSchema.model_validate(r) for r in responses]
-
-
-@connection
-async def get_all_feedbacks(session) -> List[FeedbackSchema]:
-    """Get all feedback entries"""
-    result = await session.execute(
-        select(Feedback).order_by(Feedback.created_at.desc())
-    )
-    feedbacks = result.scalars().all()
-    return [FeedbackSchema.model_validate(f) for f in feedbacks]
-
-
-@connection
-async def set_user(session, tg_id: int, first_name: str = None, username: str = None):
-    """Create or get user by Telegram ID"""
-    user = await session.scalar(select(User).where(User.tg_id == tg_id))
-    if user:
-        return UserSchema.model_validate(user)
-
-    new_user = User(tg_id=tg_id, first_name=first_name, username=username)
-    session.add(new_user)
-    await session.commit()
-    await session.refresh(new_user)
-    return UserSchema.model_validate(new_user)
-
-
-def get_all_responses(session) -> List[UserResponseSchema]:
-    """Get all user responses"""
-    result = await session.execute(
-        select(UserResponse).order_by(UserResponse.created_at.desc())
-    )
-    responses = result.scalars().all()
-    return [UserResponseSchema.model_validate(r) for r in responses]
+async def get_all_responses(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[
+    UserResponseSchema]:
+    """Get one page of user responses, newest first"""
+    items, next_cursor = await paginate(session, select(UserResponse), UserResponse, UserResponseSchema, limit, cursor)
+    return PageSchema[UserResponseSchema](items=items, next_cursor=next_cursor)
 
 
 @connection
-async def get_all_feedbacks(session) -> List[FeedbackSchema]:
-    """Get all feedback entries"""
-    result = await session.execute(
-        select(Feedback).order_by(Feedback.created_at.desc())
-    )
-    feedbacks = result.scalars().all()
-    return [FeedbackSchema.model_validate(f) for f in feedbacks]
+async def get_all_feedbacks(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[
+    FeedbackSchema]:
+    """Get one page of feedback entries, newest first"""
+    items, next_cursor = await paginate(session, select(Feedback), Feedback, FeedbackSchema, limit, cursor)
+    return PageSchema[FeedbackSchema](items=items, next_cursor=next_cursor)
 
 
 @connection
-async def set_user(session, tg_id: int, first_name: str = None, username: str = None):
+async def set_user(session, tg_id: int, first_name: str = None, username: str = None) -> UserSchema:
     """Create or get user by Telegram ID"""
-    user = await session.scalar(select(User).where(User.tg_id == tg_id))
-    if user:
-        return UserSchema.model_validate(user)
+    return await upsert_user(session, tg_id, first_name, username)
 
-    new_user = User(tg_id=tg_id, first_name=first_name, username=username)
-    session.add(new_user)
-    await session.commit()
-    await session.refresh(new_user)
-    return UserSchema.model_validate(new_user)
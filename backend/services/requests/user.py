@@ -2,30 +2,45 @@ from sqlalchemy import select
 from fastapi import HTTPException
 from backend.models.schemas.schemas import (
  UserCreateSchema,
-    UserSchema, UserUpdateSchema
+    UserSchema, UserUpdateSchema, PageSchema
 )
-from typing import List, Optional
+from typing import Optional
+from collections import OrderedDict
+import time
 
 from backend.models.tables.user import User
-from backend.services.conn import connection
-
+from backend.core.config import settings
+from backend.services.conn import connection, dialect_insert, after_commit
+from backend.services.pagination import paginate, DEFAULT_PAGE_SIZE
+
+
+
+async def upsert_user(session, tg_id: int, first_name: str, username: Optional[str] = None) -> UserSchema:
+    """Register a Telegram user, or refresh their names, in one INSERT ... ON CONFLICT statement.
+
+    Concurrent registrations of the same tg_id cannot race: the loser of the insert
+    turns into an update of the winner's row.
+    """
+    stmt = dialect_insert(session)(User).values(tg_id=tg_id, first_name=first_name, username=username)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.tg_id],
+        set_={
+            "first_name": stmt.excluded.first_name,
+            "username": stmt.excluded.username,
+        },
+    ).returning(User)
+    user = UserSchema.model_validate(await session.scalar(stmt, execution_options={"populate_existing": True}))
+    await session.commit()
+    after_commit(session, lambda: user_cache.put(user))
+    return user
 
 
 # User CRUD Operations
 @connection
 async def create_user(session, user_data: UserCreateSchema) -> UserSchema:
-    """Create a new user"""
+    """Create a new user, or return the existing one with its names refreshed"""
     try:
-        # Check if user already exists
-        existing_user = await session.scalar(select(User).where(User.tg_id == user_data.tg_id))
-        if existing_user:
-            return UserSchema.model_validate(existing_user)
-
-        new_user = User(**user_data.model_dump())
-        session.add(new_user)
-        await session.commit()
-        await session.refresh(new_user)
-        return UserSchema.model_validate(new_user)
+        return await upsert_user(session, user_data.tg_id, user_data.first_name, user_data.username)
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating user: {str(e)}")
@@ -50,11 +65,10 @@ async def get_user_by_id(session, user_id: int) -> Optional[UserSchema]:
 
 
 @connection
-async def get_all_users(session) -> List[UserSchema]:
-    """Get all users"""
-    result = await session.execute(select(User).order_by(User.created_at.desc()))
-    users = result.scalars().all()
-    return [UserSchema.model_validate(user) for user in users]
+async def get_all_users(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[UserSchema]:
+    """Get one page of users, newest first"""
+    items, next_cursor = await paginate(session, select(User), User, UserSchema, limit, cursor)
+    return PageSchema[UserSchema](items=items, next_cursor=next_cursor)
 
 
 @connection
@@ -69,6 +83,7 @@ async def update_user(session, tg_id: int, user_data: UserUpdateSchema) -> Optio
         setattr(user, field, value)
 
     await session.commit()
+    after_commit(session, lambda: user_cache.invalidate(tg_id))
     await session.refresh(user)
     return UserSchema.model_validate(user)
 
@@ -82,5 +97,59 @@ async def delete_user(session, tg_id: int) -> bool:
 
     await session.delete(user)
     await session.commit()
+    after_commit(session, lambda: user_cache.invalidate(tg_id))
     return True
 
+
+class UserCache:
+    """Bounded LRU of Telegram id -> user, so the bot can resolve users without a query per message.
+
+    Registration fills it and user updates and deletes drop their entry. Entries
+    also expire after ``ttl`` seconds, which bounds how long a change made by
+    another process (such as the API) can go unseen.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # tg_id -> (UserSchema, expires_at)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tg_id: int) -> Optional[UserSchema]:
+        entry = self._entries.get(tg_id)
+        if entry and entry[1] > time.monotonic():
+            self._entries.move_to_end(tg_id)
+            self.hits += 1
+            return entry[0]
+        if entry:
+            del self._entries[tg_id]
+        self.misses += 1
+        return None
+
+    def put(self, user: UserSchema):
+        self._entries[user.tg_id] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user.tg_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tg_id: int):
+        self._entries.pop(tg_id, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses}
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+
+async def get_cached_user(tg_id: int) -> Optional[UserSchema]:
+    """Get user by Telegram ID, from the in-process cache when possible"""
+    user = user_cache.get(tg_id)
+    if user is None:
+        user = await get_user(tg_id)
+        if user is not None:
+            user_cache.put(user)
+    return user
+
@@ -1,23 +1,55 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert, literal, union_all
 from fastapi import HTTPException
 from backend.models.tables.question import Question
 from backend.models.schemas.schemas import (UserResponseCreateSchema,
-                                            UserResponseSchema, UserResponseUpdateSchema
+                                            UserResponseSchema, UserResponseUpdateSchema, PageSchema,
+                                            BulkInsertResultSchema
                                             )
-from typing import List, Optional
+from typing import List, Optional, AsyncIterator
+from datetime import datetime
 
 from backend.models.tables.user import User
 from backend.models.tables.user_response import UserResponse
-from backend.services.conn import connection
+from backend.models.tables.scoring_job import ScoringJob
+from backend.core.db.models import async_session
+from backend.services.conn import connection, after_commit
+from backend.services.requests import rollup, scoring_job
+from backend.services.pagination import paginate, created_at_bound, DEFAULT_PAGE_SIZE
 
+EXPORT_BATCH_SIZE = 1000
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ROWS = 10000
 
 
 
 
+
+def _publish_rollup(user_rollup, first_name: Optional[str] = None):
+    """Write a committed rollup through to the in-memory leaderboard"""
+    # analytics imports this module, so the cache is imported lazily
+    from backend.services.requests.analytics import leaderboard_cache
+
+    average = user_rollup.overall_sum / user_rollup.overall_count if user_rollup.overall_count else None
+    leaderboard_cache.record(user_rollup.user_id, user_rollup.response_count, average, first_name)
+
+
+def _refresh_leaderboard():
+    from backend.services.requests.analytics import leaderboard_cache
+
+    leaderboard_cache.invalidate()
+
+
+def _wake_scoring_workers():
+    # the worker pool imports this module, so it is imported lazily as well
+    from backend.services.scoring_worker import scoring_workers
+
+    scoring_workers.wake()
+
+
 # User Response CRUD Operations
 @connection
 async def create_user_response(session, response_data: UserResponseCreateSchema) -> UserResponseSchema:
-    """Create a new user response"""
+    """Create a new user response; one without scores is queued for AI scoring"""
     try:
         # Verify user and question exist
         user = await session.scalar(select(User).where(User.id == response_data.user_id))
@@ -30,7 +62,17 @@ async def create_user_response(session, response_data: UserResponseCreateSchema)
 
         new_response = UserResponse(**response_data.model_dump())
         session.add(new_response)
+        await session.flush()
+        snapshot = rollup.score_snapshot(new_response)
+        user_rollup = await rollup.record_response_change(session, None, snapshot)
+        unscored = all(snapshot[f"{field}_score"] is None for field in rollup.SCORE_FIELDS)
+        if unscored:
+            # Queued in the same transaction, so a saved answer always gets scored
+            scoring_job.enqueue(session, new_response.id)
         await session.commit()
+        after_commit(session, lambda: _publish_rollup(user_rollup, first_name=user.first_name))
+        if unscored:
+            after_commit(session, _wake_scoring_workers)
         await session.refresh(new_response)
         return UserResponseSchema.model_validate(new_response)
     except HTTPException:
@@ -40,6 +82,67 @@ async def create_user_response(session, response_data: UserResponseCreateSchema)
         raise HTTPException(status_code=400, detail=f"Error creating response: {str(e)}")
 
 
+async def _missing_references(session, rows: List[UserResponseCreateSchema]) -> List[dict]:
+    """Check every user_id and question_id of a bulk insert with one query"""
+    user_ids = {row.user_id for row in rows}
+    question_ids = {row.question_id for row in rows}
+    result = await session.execute(union_all(
+        select(literal("user").label("kind"), User.id).where(User.id.in_(user_ids)),
+        select(literal("question").label("kind"), Question.id).where(Question.id.in_(question_ids)),
+    ))
+    found = {(kind, row_id) for kind, row_id in result}
+
+    errors = []
+    for index, row in enumerate(rows):
+        if ("user", row.user_id) not in found:
+            errors.append({"index": index, "detail": "User not found"})
+        if ("question", row.question_id) not in found:
+            errors.append({"index": index, "detail": "Question not found"})
+    return errors
+
+
+@connection
+async def create_user_responses(session, rows: List[UserResponseCreateSchema]) -> BulkInsertResultSchema:
+    """Insert many user responses at once; all of them are saved or none are.
+
+    Foreign keys are checked with a single query and rows go in as multi-row
+    INSERT ... RETURNING statements of BULK_CHUNK_SIZE rows. Unscored rows are
+    queued for scoring and the affected users' rollups are recomputed once.
+    """
+    errors = await _missing_references(session, rows)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    # A Core insert on the table: the ORM bulk path would split the rows into one
+    # statement per pattern of NULL columns instead of batching them. On SQLite,
+    # sort_by_parameter_order would also fall back to one statement per row, while
+    # a single multi-row INSERT already returns its rows in VALUES order there.
+    table = UserResponse.__table__
+    scores = [table.c[f"{field}_score"] for field in rollup.SCORE_FIELDS]
+    stmt = insert(table).returning(
+        table.c.id, *scores, sort_by_parameter_order=session.bind.dialect.name != "sqlite"
+    )
+    ids, unscored = [], []
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        result = await session.execute(stmt, [row.model_dump() for row in rows[start:start + BULK_CHUNK_SIZE]])
+        for response_id, *values in result:
+            ids.append(response_id)
+            if all(value is None for value in values):
+                unscored.append(
+                    {"response_id": response_id, "status": scoring_job.PENDING, "run_after": scoring_job.utcnow()}
+                )
+
+    for start in range(0, len(unscored), BULK_CHUNK_SIZE):
+        await session.execute(insert(ScoringJob.__table__), unscored[start:start + BULK_CHUNK_SIZE])
+
+    await rollup.refresh_user_rollups(session, [row.user_id for row in rows])
+    await session.commit()
+    after_commit(session, _refresh_leaderboard)
+    if unscored:
+        after_commit(session, _wake_scoring_workers)
+    return BulkInsertResultSchema(inserted=len(ids), ids=ids)
+
+
 @connection
 async def get_user_response(session, response_id: int) -> Optional[UserResponseSchema]:
     """Get user response by ID"""
@@ -49,11 +152,28 @@ async def get_user_response(session, response_id: int) -> Optional[UserResponseS
     return UserResponseSchema.model_validate(response)
 
 @connection
-async def get_all_responses(session) -> List[UserResponseSchema]:
-    """Get all user responses"""
-    result = await session.execute(select(UserResponse).order_by(UserResponse.created_at.desc()))
-    responses = result.scalars().all()
-    return [UserResponseSchema.model_validate(r) for r in responses]
+async def get_all_responses(session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> PageSchema[
+    UserResponseSchema]:
+    """Get one page of user responses, newest first"""
+    items, next_cursor = await paginate(session, select(UserResponse), UserResponse, UserResponseSchema, limit, cursor)
+    return PageSchema[UserResponseSchema](items=items, next_cursor=next_cursor)
+
+
+async def stream_responses(since: Optional[datetime] = None, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[
+    List[dict]]:
+    """Stream user responses oldest first, in batches, over a server-side cursor.
+
+    Rows are yielded as plain dicts and never become ORM objects, so memory stays
+    flat no matter how many rows the table holds.
+    """
+    async with async_session() as session:
+        stmt = select(*UserResponse.__table__.columns).order_by(UserResponse.created_at, UserResponse.id)
+        if since:
+            stmt = stmt.where(UserResponse.created_at >= created_at_bound(session, since))
+
+        result = await session.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield [dict(row._mapping) for row in rows]
 
 
 @connection
@@ -84,11 +204,15 @@ async def update_user_response(session, response_id: int, response_data: UserRes
     if not response:
         return None
 
+    before = rollup.score_snapshot(response)
     update_data = response_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(response, field, value)
 
+    await session.flush()
+    user_rollup = await rollup.record_response_change(session, before, rollup.score_snapshot(response))
     await session.commit()
+    after_commit(session, lambda: _publish_rollup(user_rollup))
     await session.refresh(response)
     return UserResponseSchema.model_validate(response)
 
@@ -100,6 +224,10 @@ async def delete_user_response(session, response_id: int) -> bool:
     if not response:
         return False
 
+    before = rollup.score_snapshot(response)
     await session.delete(response)
+    await session.flush()
+    user_rollup = await rollup.record_response_change(session, before, None)
     await session.commit()
+    after_commit(session, lambda: _publish_rollup(user_rollup))
     return True
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class BackendUnavailable(Exception):
+    """A call was refused without reaching the backend"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(BackendUnavailable):
+    pass
+
+
+class BulkheadFullError(BackendUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """Stop calling a backend while most recent calls to it fail.
+
+    Outcomes of the last ``window_size`` calls are kept; once at least ``min_calls``
+    are recorded and the failure share reaches ``failure_rate`` the breaker opens and
+    refuses calls for ``open_seconds``. It then lets ``half_open_calls`` trial calls
+    through: if they all succeed it closes again, and any failure re-opens it. Calls
+    slower than ``slow_call_seconds`` count as failures even when they succeed.
+    """
+
+    def __init__(
+        self,
+        window_size: int,
+        failure_rate: float,
+        min_calls: int,
+        open_seconds: float,
+        half_open_calls: int,
+        slow_call_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._outcomes = deque(maxlen=window_size)  # True for success
+        self.state = CLOSED
+        self._generation = 0  # bumped on every transition, so late results of older calls are ignored
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    def _transition(self, state: str):
+        self.state = state
+        self._generation += 1
+        self._outcomes.clear()
+        self._trials = self._trial_successes = 0
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self.opened += 1
+
+    def _before_call(self) -> int:
+        if self.state == OPEN:
+            remaining = self.open_seconds - (self._clock() - self._opened_at)
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError("Scoring backend circuit is open", retry_after=remaining)
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError("Scoring backend circuit is half-open, trial calls in progress", retry_after=1)
+            self._trials += 1
+        return self._generation
+
+    def _release(self, generation: int):
+        """Give back a half-open trial slot whose call proved nothing either way"""
+        if generation == self._generation and self.state == HALF_OPEN:
+            self._trials -= 1
+
+    def _record(self, generation: int, success: bool):
+        if generation != self._generation:
+            return
+
+        if self.state == HALF_OPEN:
+            if not success:
+                self._transition(OPEN)
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self._transition(CLOSED)
+            return
+
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+            self._transition(OPEN)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+    ) -> T:
+        """Run ``fn`` through the breaker; ``is_failure`` decides which errors count against the backend"""
+        generation = self._before_call()
+        started = self._clock()
+        try:
+            result = await fn()
+        except (BackendUnavailable, asyncio.CancelledError):
+            self._release(generation)
+            raise
+        except Exception as e:
+            self._record(generation, not is_failure(e))
+            raise
+
+        slow = self.slow_call_seconds is not None and self._clock() - started > self.slow_call_seconds
+        self._record(generation, not slow)
+        return result
+
+    def stats(self) -> dict:
+        failures = self._outcomes.count(False)
+        return {
+            "state": self.state,
+            "state_gauge": STATE_GAUGE[self.state],
+            "window_calls": len(self._outcomes),
+            "window_failure_rate": round(failures / len(self._outcomes), 4) if self._outcomes else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class Bulkhead:
+    """Cap concurrent calls to a backend, refusing callers that cannot get a slot within ``max_wait`` seconds"""
+
+    def __init__(self, max_concurrent: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        async with self.slot():
+            return await fn()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot for the whole block, e.g. while a response streams"""
+        try:
+            if self.max_wait <= 0 and self._semaphore.locked():
+                raise asyncio.TimeoutError()
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait or None)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BulkheadFullError("Scoring backend is at its concurrency limit", retry_after=1)
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {"active": self.active, "max_concurrent": self.max_concurrent, "rejected": self.rejected}
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from backend.models.schemas.schemas import ScoreRequests
+from backend.services.text import normalize_text
+
+
+def score_key(req: ScoreRequests) -> str:
+    """Content hash of a scoring request, insensitive to case and whitespace"""
+    payload = json.dumps([normalize_text(req.question), normalize_text(req.answer), req.part])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def stream_score_key(req: ScoreRequests) -> str:
+    """Cache key of a streamed result, kept apart from the backend's /score result for the same request"""
+    return f"stream:{score_key(req)}"
+
+
+class _DiskTier:
+    """SQLite-backed second tier that survives restarts"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS score_cache (key TEXT PRIMARY KEY, score TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute("SELECT score, expires_at FROM score_cache WHERE key = ?", (key,)).fetchone()
+        if row and row[1] <= time.time():
+            return None
+        return row
+
+    def set(self, key: str, score: str, expires_at: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO score_cache (key, score, expires_at) VALUES (?, ?, ?)", (key, score, expires_at)
+            )
+
+    def purge_expired(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM score_cache WHERE expires_at <= ?", (time.time(),))
+
+
+class ScoreCache:
+    """LRU + TTL cache of scoring results, with an optional on-disk second tier.
+
+    Expiry is stored as wall-clock time so that entries promoted from disk keep
+    the TTL they were written with.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (score, expires_at)
+        self._disk = _DiskTier(path) if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, score: str, expires_at: float):
+        self._entries[key] = (score, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.time():
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry[0]
+        if entry:
+            del self._entries[key]
+
+        if self._disk:
+            row = await asyncio.to_thread(self._disk.get, key)
+            if row:
+                self._remember(key, *row)
+                self.disk_hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, score: str):
+        expires_at = time.time() + self.ttl
+        self._remember(key, score, expires_at)
+        if self._disk:
+            await asyncio.to_thread(self._disk.set, key, score, expires_at)
+
+    async def purge_expired(self):
+        now = time.time()
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        if self._disk:
+            await asyncio.to_thread(self._disk.purge_expired)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "disk_tier": self._disk is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
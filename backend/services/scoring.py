@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import math
+import re
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from backend.core.config import settings
+from backend.models.schemas.schemas import ScoreRequests, ScoreBatchItem
+from backend.services.resilience import CircuitBreaker, Bulkhead
+from backend.services.score_cache import ScoreCache, score_key, stream_score_key
+from backend.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+score_cache = ScoreCache(settings.SCORE_CACHE_SIZE, settings.SCORE_CACHE_TTL, settings.SCORE_CACHE_PATH or None)
+in_flight = SingleFlight()
+breaker = CircuitBreaker(
+    window_size=settings.AI_BREAKER_WINDOW,
+    failure_rate=settings.AI_BREAKER_FAILURE_RATE,
+    min_calls=settings.AI_BREAKER_MIN_CALLS,
+    open_seconds=settings.AI_BREAKER_OPEN_SECONDS,
+    half_open_calls=settings.AI_BREAKER_HALF_OPEN_CALLS,
+    slow_call_seconds=settings.AI_BREAKER_SLOW_CALL_SECONDS or None,
+)
+bulkhead = Bulkhead(settings.AI_BULKHEAD_SIZE, settings.AI_BULKHEAD_WAIT)
+
+# Labels the AI backend uses for each band score, e.g. "Fluency & Coherence: 7.5"
+CRITERIA = {
+    "fluency_score": r"\bfluency\b",
+    "pronunciation_score": r"\bpronunciation\b",
+    "grammar_score": r"\b(?:grammar|grammatical range)\b",
+    "vocabulary_score": r"\b(?:vocabulary|lexical resource)\b",
+    # Only at the start of a line: criterion lines may say "band" too, e.g. "Fluency band: 6"
+    "overall_score": r"^[ \t*#>-]*overall(?: band)?(?: score)?\b",
+}
+
+
+def parse_assessment(text: str) -> dict:
+    """Pull the band scores out of the AI backend's answer; the full text becomes the feedback"""
+    scores = {}
+    for field, pattern in CRITERIA.items():
+        match = re.search(rf"{pattern}[^0-9\n]{{0,25}}?(\d(?:\.\d+)?)", text, re.IGNORECASE | re.MULTILINE)
+        if match and 0 <= float(match.group(1)) <= 9:
+            scores[field] = float(match.group(1))
+
+    criteria = [scores[field] for field in CRITERIA if field != "overall_score" and field in scores]
+    if "overall_score" not in scores and len(criteria) == 4:
+        # IELTS reports the mean of the four criteria rounded to the nearest half band
+        scores["overall_score"] = math.floor(sum(criteria) / 4 * 2 + 0.5) / 2
+    if not scores:
+        raise ValueError("AI response contained no band scores")
+    return {**scores, "ai_feedback": text}
+
+
+def _is_assessment(text: str) -> bool:
+    try:
+        parse_assessment(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _http2_enabled() -> bool:
+    if not settings.AI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("AI_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for the scoring backend, created on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.AI_API,
+            http2=_http2_enabled(),
+            timeout=httpx.Timeout(settings.AI_READ_TIMEOUT, connect=settings.AI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.AI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AI_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _is_backend_failure(error: BaseException) -> bool:
+    """Timeouts, connection errors and 5xx replies count against the breaker; 4xx replies do not"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def _post_score(req: ScoreRequests) -> str:
+    response = await get_client().post("/score", json=req.model_dump())
+    response.raise_for_status()
+    return response.json().get("score", "Something went wrong. No score returned.")
+
+
+async def request_score(req: ScoreRequests) -> str:
+    """Ask the scoring backend to score one answer.
+
+    Raises BackendUnavailable without calling the backend when the circuit
+    breaker is open or the bulkhead has no free slot.
+    """
+    return await breaker.call(lambda: bulkhead.run(lambda: _post_score(req)), is_failure=_is_backend_failure)
+
+
+async def _open_stream(req: ScoreRequests) -> httpx.Response:
+    client = get_client()
+    response = await client.send(client.build_request("POST", "/score/stream", json=req.model_dump()), stream=True)
+    if response.is_error:
+        await response.aread()
+        await response.aclose()
+        response.raise_for_status()
+    return response
+
+
+async def stream_score(req: ScoreRequests) -> AsyncIterator[str]:
+    """Yield the backend's feedback text as it is generated.
+
+    A cached result is yielded whole. Otherwise the stream holds a bulkhead slot
+    until it ends, and opening it goes through the circuit breaker. The text is
+    cached, apart from ``score_answer`` results, only if the stream ran to its end
+    and carries band scores.
+    """
+    key = stream_score_key(req)
+    score = await score_cache.get(key)
+    if score is not None:
+        yield score
+        return
+
+    parts = []
+    completed = False
+    async with bulkhead.slot():
+        response = await breaker.call(lambda: _open_stream(req), is_failure=_is_backend_failure)
+        try:
+            async for chunk in response.aiter_text():
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            await response.aclose()
+    text = "".join(parts)
+    if completed and _is_assessment(text):
+        await score_cache.set(key, text)
+
+
+async def _score_and_cache(req: ScoreRequests, key: str) -> str:
+    score = await request_score(req)
+    # A fallback or otherwise degraded answer would outlive the outage that caused it
+    if _is_assessment(score):
+        await score_cache.set(key, score)
+    return score
+
+
+async def score_answer(req: ScoreRequests) -> str:
+    """Score one answer, reusing the result for identical (normalised) requests.
+
+    Cached results are returned directly; concurrent identical requests that miss
+    the cache share a single upstream call. Only answers with band scores are cached.
+    """
+    key = score_key(req)
+    score = await score_cache.get(key)
+    if score is None:
+        score = await in_flight.do(key, lambda: _score_and_cache(req, key))
+    return score
+
+
+async def score_batch(reqs: List[ScoreRequests], concurrency: Optional[int] = None) -> List[ScoreBatchItem]:
+    """Score many answers with at most ``concurrency`` upstream calls at a time.
+
+    Results come back in request order; a failed item carries its error instead
+    of failing the whole batch.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.AI_BATCH_CONCURRENCY)
+
+    async def score_one(req: ScoreRequests) -> ScoreBatchItem:
+        async with semaphore:
+            try:
+                return ScoreBatchItem(score=await score_answer(req))
+            except Exception as e:
+                logger.warning(f"Batch scoring item failed: {e}")
+                return ScoreBatchItem(error=f"Something wrong with ai: {str(e)}")
+
+    return list(await asyncio.gather(*(score_one(req) for req in reqs)))
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from backend.core.config import settings
+from backend.models.schemas.schemas import UserResponseUpdateSchema, ScoringJobSchema
+from backend.models.tables.scoring_job import ScoringJob
+from backend.services import scoring
+from backend.services.conn import unit_of_work
+from backend.services.resilience import BackendUnavailable
+from backend.services.requests import scoring_job, user_response
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """Another worker re-leased the job after this worker's lease expired"""
+
+
+class InvalidAssessment(Exception):
+    """The AI backend answered without band scores"""
+
+
+class ScoringWorkerPool:
+    """Async workers that drain the scoring_jobs table.
+
+    Every worker leases one job at a time, scores it through the shared scoring
+    client and writes the result back to the response. Any number of pools, in any
+    number of processes, can share the table.
+    """
+
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.completed = 0
+        self.retried = 0
+        self.deferred = 0
+        self.failed = 0
+
+    def start(self):
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(), name=f"scoring-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    def wake(self):
+        """Tell idle workers a job was just enqueued, instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                jobs = await scoring_job.lease_jobs(limit=1)
+            except Exception as e:
+                logger.error(f"Could not lease scoring jobs: {e}")
+                jobs = []
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for job in jobs:
+                await self.process(job)
+
+    async def process(self, job: ScoringJob):
+        try:
+            req = await scoring_job.get_score_request(job.response_id)
+            if req is None:
+                raise LookupError(f"Response {job.response_id} no longer exists")
+            text = await scoring.score_answer(req)
+            try:
+                assessment = scoring.parse_assessment(text)
+            except ValueError as e:
+                raise InvalidAssessment(str(e)) from e
+
+            async with unit_of_work():
+                await user_response.update_user_response(job.response_id, UserResponseUpdateSchema(**assessment))
+                if not await scoring_job.complete_job(job.id, job.attempts):
+                    raise LeaseLost()
+            self.completed += 1
+        except LeaseLost:
+            logger.warning(f"Scoring job {job.id} was re-leased by another worker; discarding this result")
+        except asyncio.CancelledError:
+            raise
+        except BackendUnavailable as e:
+            # Refused before reaching the backend (circuit open or bulkhead full): not the job's fault
+            logger.info(f"Scoring job {job.id} deferred for {e.retry_after:.0f}s: {e}")
+            if await scoring_job.defer_job(job.id, job.attempts, e.retry_after, str(e)):
+                self.deferred += 1
+        except Exception as e:
+            logger.warning(f"Scoring job {job.id} attempt {job.attempts} failed: {e}")
+            status = await scoring_job.fail_job(job.id, job.attempts, str(e) or type(e).__name__,
+                                                retry=not isinstance(e, InvalidAssessment))
+            if status == scoring_job.FAILED:
+                self.failed += 1
+            elif status == scoring_job.PENDING:
+                self.retried += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "completed": self.completed,
+            "retried": self.retried,
+            "deferred": self.deferred,
+            "failed": self.failed,
+        }
+
+
+scoring_workers = ScoringWorkerPool(settings.SCORING_WORKERS, settings.SCORING_POLL_INTERVAL)
+
+
+async def wait_for_job(response_id: int, timeout: float, poll_interval: Optional[float] = None) -> Optional[ScoringJobSchema]:
+    """Poll a response's scoring job until it is done or failed; None on timeout"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        job = await scoring_job.get_job_by_response(response_id)
+        if job is None or job.status in (scoring_job.DONE, scoring_job.FAILED):
+            return job
+        if loop.time() >= deadline:
+            return None
+        await asyncio.sleep(poll_interval or settings.SCORING_POLL_INTERVAL)
+
+
+async def main():
+    """Run a standalone worker pool: python -m backend.services.scoring_worker"""
+    import backend.models.tables  # noqa: F401  (register every table)
+    from backend.core.db.models import init_db, engine
+
+    logging.basicConfig(level=logging.INFO)
+    await init_db()
+    scoring_workers.start()
+    logger.info(f"Scoring workers started: {scoring_workers.workers}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await scoring_workers.stop()
+        await scoring.close_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
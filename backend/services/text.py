@@ -0,0 +1,12 @@
+import hashlib
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Fold text for comparison: Unicode NFKC, case-folded, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the normalized text, for deduplicating near-identical strings"""
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Optional, Set
+
+from telegram import Update
+from telegram.ext import Application, BaseUpdateProcessor
+
+from backend.models.tables.bot_update import BotUpdate
+from backend.services.requests import bot_update as rq
+
+logger = logging.getLogger(__name__)
+
+MAX_UPDATE_ATTEMPTS = 3  # an update whose handling never finishes is dropped after this many leases
+
+
+def chat_key(update: object) -> Optional[int]:
+    """Chat an update belongs to, or None for updates without one"""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return None
+
+
+class ChatSequentialUpdateProcessor(BaseUpdateProcessor):
+    """Process updates of different chats concurrently, and those of one chat one at a time in arrival order.
+
+    An update for a chat that is already being processed joins that chat's backlog and is
+    run by the task holding the chat, so it does not take a concurrency slot while it waits.
+
+    The backlogs live in this process, so this is for the single polling process; in
+    webhook mode ``SharedUpdateQueue`` keeps the order across processes.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._backlogs: Dict[int, Deque[Awaitable[Any]]] = {}
+        self.processed = 0
+        self.deferred = 0
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = chat_key(update)
+        if key is None:
+            await coroutine
+            self.processed += 1
+            return
+
+        backlog = self._backlogs.get(key)
+        if backlog is not None:
+            backlog.append(coroutine)
+            self.deferred += 1
+            return
+
+        self._backlogs[key] = backlog = deque([coroutine])
+        try:
+            while backlog:
+                try:
+                    await backlog.popleft()
+                except Exception:
+                    logger.exception(f"Error processing an update of chat {key}")
+                self.processed += 1
+        finally:
+            del self._backlogs[key]
+            for pending in backlog:  # left over only when cancelled
+                pending.close()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent_updates": self.max_concurrent_updates,
+            "active_chats": len(self._backlogs),
+            "backlog": sum(len(backlog) for backlog in self._backlogs.values()),
+            "processed": self.processed,
+            "deferred": self.deferred,
+        }
+
+
+class SharedUpdateQueue:
+    """Webhook updates kept in the bot_updates table and handled by whichever bot process leases them.
+
+    Any number of API workers can store and handle updates. Each leases the oldest update
+    of chats that no process is handling, so a chat's updates still run one at a time in
+    order, and writes the chat's conversation state before releasing it, so the process
+    that takes the chat next reads it. An update whose process died is taken again once
+    its lease expires.
+    """
+
+    def __init__(self, application: Application, max_concurrent_updates: int, lease_seconds: int,
+                 poll_interval: float):
+        self.application = application
+        self.max_concurrent_updates = max_concurrent_updates
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._handling: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stored = 0
+        self.processed = 0
+        self.dropped = 0
+
+    async def put(self, update: Update, data: dict):
+        """Store an update received by the webhook; it is handled by this process or another one"""
+        if await rq.add_update(update.update_id, chat_key(update), data):
+            self.stored += 1
+            self.wake()
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="bot-update-queue")
+
+    async def stop(self, timeout: float):
+        """Stop leasing and give updates being handled ``timeout`` seconds to finish"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._handling:
+            _, unfinished = await asyncio.wait(self._handling, timeout=timeout)
+            for task in unfinished:  # taken again by another process once the lease expires
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            leased = []
+            free = self.max_concurrent_updates - len(self._handling)
+            if free > 0:
+                try:
+                    leased = await rq.lease_updates(free, self.lease_seconds)
+                except Exception as e:
+                    logger.error(f"Could not lease bot updates: {e}")
+            for row in leased:
+                task = asyncio.create_task(self._handle(row))
+                self._handling.add(task)
+                task.add_done_callback(self._finished)
+            if not leased:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _finished(self, task: asyncio.Task):
+        self._handling.discard(task)
+        self.wake()  # a slot is free, and the chat's next update can be leased
+
+    async def _handle(self, row: BotUpdate):
+        if row.attempts > MAX_UPDATE_ATTEMPTS:
+            logger.error(f"Dropping update {row.update_id} of chat {row.chat_id} after {row.attempts - 1} attempts")
+            self.dropped += 1
+        else:
+            try:
+                await self.application.process_update(Update.de_json(row.data, self.application.bot))
+                # Write the chat's state before releasing the chat, whichever process takes it next
+                await self.application.update_persistence()
+                await self.application.persistence.flush()
+            except Exception:
+                logger.exception(f"Error handling update {row.update_id}, it is retried once its lease expires")
+                return
+            self.processed += 1
+        if not await rq.complete_update(row.update_id, row.attempts):
+            logger.warning(f"Lease of update {row.update_id} expired while it was handled")
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent_updates": self.max_concurrent_updates,
+            "handling": len(self._handling),
+            "stored": self.stored,
+            "processed": self.processed,
+            "dropped": self.dropped,
+        }
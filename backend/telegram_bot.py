@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from fastapi import HTTPException
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application,
@@ -14,10 +15,15 @@ from backend.models.tables.feedback import Feedback
 from backend.models.tables.question import Question
 from backend.models.tables.user_response import UserResponse
 from backend.core.db.models import Base
+from backend.core.config import settings
 
-from backend.models.schemas.schemas import UserCreateSchema  # make sure it's imported
+from backend.models.schemas.schemas import UserCreateSchema, UserResponseCreateSchema
 
 from backend.services.requests.user import create_user
+from backend.services.scoring_worker import wait_for_job
+from backend.services.update_processor import ChatSequentialUpdateProcessor, SharedUpdateQueue
+from backend.services.bot_persistence import DatabasePersistence
+from backend.services.outbound import OutboundScheduler
 
 
 
@@ -44,11 +50,52 @@ logger = logging.getLogger(__name__)
 TELEGRAM_TOKEN = os.getenv("BOT_TOKEN")  # Replace with your bot token
 # API_BASE_URL = "http://localhost:8000/api"  # Your FastAPI server URL
 API_BASE_URL = os.getenv("API_BASE_URL", "http://miniapp-api:8000/api")
+SCORING_WAIT_SECONDS = 120  # how long to wait for the scoring workers before pointing to /progress
+OUTBOX_DRAIN_SECONDS = 10  # how long shutdown waits for queued messages to go out
+UPDATES_DRAIN_SECONDS = 10  # how long shutdown waits for updates being handled
+
+
+def format_score(score: Optional[float]) -> str:
+    """Format an average score, which is None when no response carries it yet"""
+    return f"{score:.1f}" if score is not None else "-"
 
 
 class SpeakoAIBot:
-    def __init__(self):
-        self.application = Application.builder().token(TELEGRAM_TOKEN).build()
+    def __init__(self, webhook: bool = False):
+        builder = (
+            Application.builder()
+            .token(TELEGRAM_TOKEN)
+            .base_url(settings.BOT_API_URL)
+            # Conversation state lives in the database, so it survives restarts and is shared by API workers
+            .persistence(DatabasePersistence(
+                update_interval=settings.BOT_STATE_FLUSH_INTERVAL,
+                batch_size=settings.BOT_STATE_BATCH_SIZE,
+                # Another worker may have handled the user's last update, so always read the state in webhook mode
+                refresh_seconds=0 if webhook else settings.BOT_STATE_REFRESH_SECONDS,
+            ))
+            .post_stop(self.drain_outbox)
+        )
+        if webhook:
+            # Updates are pushed to the API's webhook route, so no polling updater is needed
+            builder = builder.updater(None)
+        else:
+            # Chats are served concurrently, each chat's own updates still in order
+            builder = builder.concurrent_updates(ChatSequentialUpdateProcessor(settings.BOT_CONCURRENT_UPDATES))
+        self.application = builder.build()
+        # Webhook updates go through the database, so every API worker can take them without reordering a chat
+        self.updates = SharedUpdateQueue(
+            self.application,
+            settings.BOT_CONCURRENT_UPDATES,
+            lease_seconds=settings.BOT_UPDATE_LEASE_SECONDS,
+            poll_interval=settings.BOT_UPDATE_POLL_INTERVAL,
+        ) if webhook else None
+        # Every message goes out through the scheduler, which keeps the bot within Telegram's flood limits
+        self.outbox = OutboundScheduler(
+            rate=settings.BOT_SEND_RATE,
+            chat_rate=settings.BOT_CHAT_SEND_RATE,
+            chat_burst=settings.BOT_CHAT_SEND_BURST,
+            max_in_flight=settings.BOT_SEND_CONCURRENCY,
+        )
         self.setup_handlers()
 
     def setup_handlers(self):
@@ -71,6 +118,16 @@ class SpeakoAIBot:
         )
 
 
+    def reply(self, update: Update, text: str, **kwargs) -> asyncio.Future:
+        """Queue a reply to the update's message; returns without waiting for it to be sent"""
+        message = update.effective_message
+        return self.outbox.submit(update.effective_chat.id, lambda: message.reply_text(text, **kwargs))
+
+    def edit(self, update: Update, text: str, **kwargs) -> asyncio.Future:
+        """Queue an edit of the message whose inline button was pressed"""
+        query = update.callback_query
+        return self.outbox.submit(update.effective_chat.id, lambda: query.edit_message_text(text, **kwargs))
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
@@ -113,12 +170,12 @@ Ready to start practicing? Use /practice to begin!
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
-            await update.message.reply_text(welcome_message, reply_markup=reply_markup)
+            self.reply(update, welcome_message, reply_markup=reply_markup)
 
         except Exception as e:
             logger.error(f"Error registering user: {e}")
-            await update.message.reply_text(
-                "Sorry, there was an error. Please try again later."
+            self.reply(
+                update, "Sorry, there was an error. Please try again later."
             )
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -154,7 +211,7 @@ Ready to start practicing? Use /practice to begin!
 
 Need more help? Contact support@speakoai.com
         """
-        await update.message.reply_text(help_text)
+        self.reply(update, help_text)
 
     async def practice_command(
             self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -180,8 +237,8 @@ Need more help? Contact support@speakoai.com
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
 
-        await update.message.reply_text(
-            "🎯 Choose an IELTS Speaking part to practice:", reply_markup=reply_markup
+        self.reply(
+            update, "🎯 Choose an IELTS Speaking part to practice:", reply_markup=reply_markup
         )
 
     async def progress_command(
@@ -191,29 +248,34 @@ Need more help? Contact support@speakoai.com
         user = update.effective_user
 
         try:
-            # Get user from database
-            user_data = await rq_user.get_user(tg_id=user.id)
+            # Resolve the Telegram user from the bot's cache
+            user_data = await rq_user.get_cached_user(user.id)
             if not user_data:
-                await update.message.reply_text("Please use /start to register first.")
+                self.reply(update, "Please use /start to register first.")
                 return
 
             # Get user analytics
-            analytics = await rq_analytics.get_user_scores(user_id=user_data["id"])
+            analytics = await rq_analytics.get_user_scores(user_id=user_data.id)
+            if analytics is None:
+                # Deleted since it was cached
+                rq_user.user_cache.invalidate(user.id)
+                self.reply(update, "Please use /start to register first.")
+                return
 
-            if analytics and analytics.total_responses > 0:
+            if analytics.total_responses > 0:
                 progress_text = f"""
 📊 Your Progress Report
 
 **Overall Statistics:**
 • Total Responses: {analytics.total_responses}
-• Average Overall Score: {analytics.average_overall_score:.1f}/9.0
-• Best Score: {analytics.best_score:.1f}/9.0
+• Average Overall Score: {format_score(analytics.average_overall_score)}/9.0
+• Best Score: {format_score(analytics.best_score)}/9.0
 
 **Detailed Scores:**
-• Fluency: {analytics.average_fluency_score:.1f}/9.0
-• Pronunciation: {analytics.average_pronunciation_score:.1f}/9.0
-• Grammar: {analytics.average_grammar_score:.1f}/9.0
-• Vocabulary: {analytics.average_vocabulary_score:.1f}/9.0
+• Fluency: {format_score(analytics.average_fluency_score)}/9.0
+• Pronunciation: {format_score(analytics.average_pronunciation_score)}/9.0
+• Grammar: {format_score(analytics.average_grammar_score)}/9.0
+• Vocabulary: {format_score(analytics.average_vocabulary_score)}/9.0
 
 **Recent Scores:**
 {', '.join([f"{score:.1f}" for score in analytics.recent_scores[:5]])}
@@ -230,12 +292,12 @@ Use /practice to start your IELTS speaking journey.
 Your scores will appear here after you complete some practice sessions.
                 """
 
-            await update.message.reply_text(progress_text)
+            self.reply(update, progress_text)
 
         except Exception as e:
             logger.error(f"Error getting progress: {e}")
-            await update.message.reply_text(
-                "Sorry, there was an error getting your progress."
+            self.reply(
+                update, "Sorry, there was an error getting your progress."
             )
 
     async def leaderboard_command(
@@ -243,7 +305,7 @@ Your scores will appear here after you complete some practice sessions.
     ):
         """Handle /leaderboard command"""
         try:
-            leaderboard = await rq_analytics.get_leaderboard(limit=10)
+            leaderboard = await rq_analytics.get_cached_leaderboard(limit=10)
 
             if leaderboard:
                 leaderboard_text = "🏆 Top Performers\n\n"
@@ -253,12 +315,12 @@ Your scores will appear here after you complete some practice sessions.
             else:
                 leaderboard_text = "No users have practiced yet. Be the first! 🚀"
 
-            await update.message.reply_text(leaderboard_text)
+            self.reply(update, leaderboard_text)
 
         except Exception as e:
             logger.error(f"Error getting leaderboard: {e}")
-            await update.message.reply_text(
-                "Sorry, there was an error getting the leaderboard."
+            self.reply(
+                update, "Sorry, there was an error getting the leaderboard."
             )
 
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -289,22 +351,14 @@ Your scores will appear here after you complete some practice sessions.
     ):
         """Send a question to the user"""
         try:
-            if part:
-                questions = await rq_analytics.get_questions_by_part(part)
-            else:
-                questions = await rq_analytics.get_all_questions()
+            question = await rq_question.get_random_question(part)
 
-            if not questions:
-                await update.callback_query.edit_message_text(
-                    "No questions available at the moment."
+            if not question:
+                self.edit(
+                    update, "No questions available at the moment."
                 )
                 return
 
-            # Select a random question
-            import random
-
-            question = random.choice(questions)
-
             # Store question in context for later use
             context.user_data["current_question"] = question
 
@@ -328,22 +382,22 @@ Please provide your detailed answer. Take your time and speak naturally!
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
-            await update.callback_query.edit_message_text(
-                question_text, reply_markup=reply_markup
+            self.edit(
+                update, question_text, reply_markup=reply_markup
             )
 
         except Exception as e:
             logger.error(f"Error sending question: {e}")
-            await update.callback_query.edit_message_text(
-                "Sorry, there was an error. Please try again."
+            self.edit(
+                update, "Sorry, there was an error. Please try again."
             )
 
     async def handle_question_response(
             self, update: Update, context: ContextTypes.DEFAULT_TYPE, question_id: int
     ):
         """Handle when user indicates they've answered a question"""
-        await update.callback_query.edit_message_text(
-            "Great! Now please send me your answer as a text message. "
+        self.edit(
+            update, "Great! Now please send me your answer as a text message. "
             "I'll analyze it and provide you with scores and feedback."
         )
         context.user_data["waiting_for_response"] = question_id
@@ -356,42 +410,63 @@ Please provide your detailed answer. Take your time and speak naturally!
         response_text = update.message.text
 
         if "waiting_for_response" not in context.user_data:
-            await update.message.reply_text(
-                "Please use /practice to start a practice session first."
+            self.reply(
+                update, "Please use /practice to start a practice session first."
             )
             return
 
         question_id = context.user_data["waiting_for_response"]
 
         try:
-            # Get user from database
-            user_data = await rq_user.get_user(tg_id=user.id)
+            # Resolve the Telegram user from the bot's cache
+            user_data = await rq_user.get_cached_user(user.id)
             if not user_data:
-                await update.message.reply_text("Please use /start to register first.")
+                self.reply(update, "Please use /start to register first.")
+                return
+
+            # Save the answer unscored; the scoring workers pick it up from the job queue
+            saved_response = await rq_response.create_user_response(
+                UserResponseCreateSchema(
+                    user_id=user_data.id,
+                    question_id=question_id,
+                    response_text=response_text,
+                )
+            )
+
+            self.reply(
+                update, "⏳ Thanks! Your answer is being scored, I'll send your results in a moment."
+            )
+
+            # Clear the waiting state
+            del context.user_data["waiting_for_response"]
+
+            context.application.create_task(
+                self.send_scores(update, saved_response.id, response_text)
+            )
+
+        except Exception as e:
+            if isinstance(e, HTTPException) and e.detail == "User not found":
+                # Deleted since it was cached
+                rq_user.user_cache.invalidate(user.id)
+                self.reply(update, "Please use /start to register first.")
                 return
+            logger.error(f"Error processing response: {e}")
+            self.reply(
+                update, "Sorry, there was an error processing your response."
+            )
 
-            # Create user response (with mock scores for now)
-            # In a real implementation, you'd integrate with an AI service for scoring
-            import random
-
-            mock_scores = {
-                "fluency_score": round(random.uniform(6.0, 8.5), 1),
-                "pronunciation_score": round(random.uniform(6.0, 8.5), 1),
-                "grammar_score": round(random.uniform(6.0, 8.5), 1),
-                "vocabulary_score": round(random.uniform(6.0, 8.5), 1),
-                "overall_score": round(random.uniform(6.0, 8.5), 1),
-                "ai_feedback": "Good effort! Try to expand your vocabulary and work on pronunciation. Consider using more complex sentence structures.",
-            }
-
-            response_data = {
-                "user_id": user_data["id"],
-                "question_id": question_id,
-                "response_text": response_text,
-                **mock_scores,
-            }
-
-            # Save response to database
-            saved_response = await rq_response.create_user_response(response_data)
+    async def send_scores(self, update: Update, response_id: int, response_text: str):
+        """Wait for the scoring job of a response and send the results"""
+        try:
+            job = await wait_for_job(response_id, timeout=SCORING_WAIT_SECONDS)
+            scored = await rq_response.get_user_response(response_id) if job and job.status == "done" else None
+
+            if not scored:
+                self.reply(
+                    update, "Sorry, scoring is taking longer than usual. "
+                    "Your answer is saved and your scores will show up in /progress."
+                )
+                return
 
             # Generate feedback message
             feedback_message = f"""
@@ -401,14 +476,14 @@ Please provide your detailed answer. Take your time and speak naturally!
 {response_text[:200]}{"..." if len(response_text) > 200 else ""}
 
 **Scores (IELTS Band Scale):**
-• Fluency & Coherence: {mock_scores['fluency_score']}/9.0
-• Pronunciation: {mock_scores['pronunciation_score']}/9.0
-• Grammar: {mock_scores['grammar_score']}/9.0
-• Vocabulary: {mock_scores['vocabulary_score']}/9.0
-• **Overall Band Score: {mock_scores['overall_score']}/9.0**
+• Fluency & Coherence: {format_score(scored.fluency_score)}/9.0
+• Pronunciation: {format_score(scored.pronunciation_score)}/9.0
+• Grammar: {format_score(scored.grammar_score)}/9.0
+• Vocabulary: {format_score(scored.vocabulary_score)}/9.0
+• **Overall Band Score: {format_score(scored.overall_score)}/9.0**
 
 **AI Feedback:**
-{mock_scores['ai_feedback']}
+{scored.ai_feedback}
 
 **Tips for Improvement:**
 • Practice speaking for 2-3 minutes on each topic
@@ -419,23 +494,57 @@ Please provide your detailed answer. Take your time and speak naturally!
 Ready for another question? Use /practice to continue!
             """
 
-            await update.message.reply_text(feedback_message)
-
-            # Clear the waiting state
-            del context.user_data["waiting_for_response"]
+            self.reply(update, feedback_message)
 
         except Exception as e:
-            logger.error(f"Error processing response: {e}")
-            await update.message.reply_text(
-                "Sorry, there was an error processing your response."
-            )
+            logger.error(f"Error sending scores: {e}")
+
+    async def start_webhook(self, url: str, secret_token: str):
+        """Start processing updates fed in by ``process_webhook`` and point Telegram at ``url``"""
+        await self.application.initialize()
+        await self.application.start()
+        self.updates.start()
+        await self.application.bot.set_webhook(
+            url=url,
+            secret_token=secret_token,
+            max_connections=settings.BOT_WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        logger.info(f"Telegram webhook set to {url}")
+
+    async def process_webhook(self, data: dict):
+        """Store one update received by the webhook route; raises ValueError if it can't be decoded"""
+        if not isinstance(data.get("update_id"), int) or isinstance(data["update_id"], bool):
+            raise ValueError("update_id must be an integer")
+        try:
+            update = Update.de_json(data, self.application.bot)
+        except (TypeError, KeyError, ValueError, AttributeError) as e:
+            raise ValueError(f"Malformed update: {e}") from e
+        # Updates no handler matches are acknowledged and then ignored
+        await self.updates.put(update, data)
+
+    async def stop_webhook(self):
+        """Finish updates being handled and queued messages and release the bot's HTTP connections.
+
+        The webhook stays registered; updates not handled yet stay in the database for the other workers.
+        """
+        await self.updates.stop(timeout=UPDATES_DRAIN_SECONDS)
+        await self.application.stop()
+        await self.drain_outbox()
+        await self.application.shutdown()
+
+    async def drain_outbox(self, application: Application = None):
+        await self.outbox.stop(timeout=OUTBOX_DRAIN_SECONDS)
 
     def run(self):
-        """Run the bot"""
+        """Run the bot with long polling (for development)"""
         logger.info("Starting SpeakoAI Telegram Bot...")
         self.application.run_polling()
 
 
 if __name__ == "__main__":
+    if settings.BOT_WEBHOOK_URL:
+        # Polling would delete the webhook the API has registered
+        raise SystemExit("BOT_WEBHOOK_URL is set: updates are served by the API, unset it to poll instead")
     bot = SpeakoAIBot()
     bot.run()
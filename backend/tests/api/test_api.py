@@ -43,6 +43,11 @@ async def test_endpoint(session: aiohttp.ClientSession, method: str, endpoint: s
     except Exception as e:
         return {"status": "ERROR", "data": str(e)}
 
+def page_items(result: Dict[str, Any]) -> list:
+    """Unwrap the items of a paginated list endpoint"""
+    data = result["data"]
+    return data.get("items", []) if isinstance(data, dict) else []
+
 async def run_tests():
     """Run all API tests"""
     print("🚀 Starting SpeakoAI API Tests...\n")
@@ -70,7 +75,8 @@ async def run_tests():
         print("3. Testing Get All Users...")
         result = await test_endpoint(session, "GET", "/users/")
         print(f"   Status: {result['status']}")
-        print(f"   Users found: {len(result['data']) if isinstance(result['data'], list) else 'N/A'}\n")
+        print(f"   Users found: {len(page_items(result))}")
+        print(f"   Next cursor: {result['data'].get('next_cursor') if isinstance(result['data'], dict) else 'N/A'}\n")
         
         # Test 4: Get Questions by Part
         print("4. Testing Get Questions by Part...")
@@ -82,21 +88,20 @@ async def run_tests():
         
         # Test 5: Get All Questions
         print("5. Testing Get All Questions...")
-        result = await test_endpoint(session, "GET", "/questions/")
+        result = await test_endpoint(session, "GET", "/questions/?limit=100")
         print(f"   Status: {result['status']}")
-        print(f"   Total questions: {len(result['data']) if isinstance(result['data'], list) else 'N/A'}\n")
+        print(f"   Questions on first page: {len(page_items(result))}\n")
         
         # Test 6: Create a Response (if we have users and questions)
         print("6. Testing Response Creation...")
         # First get a user and question
-        users_result = await test_endpoint(session, "GET", "/users/")
-        questions_result = await test_endpoint(session, "GET", "/questions/")
+        users = page_items(await test_endpoint(session, "GET", "/users/"))
+        questions = page_items(await test_endpoint(session, "GET", "/questions/"))
         
-        if (isinstance(users_result['data'], list) and len(users_result['data']) > 0 and
-            isinstance(questions_result['data'], list) and len(questions_result['data']) > 0):
+        if users and questions:
             
-            user_id = users_result['data'][0]['id']
-            question_id = questions_result['data'][0]['id']
+            user_id = users[0]['id']
+            question_id = questions[0]['id']
             
             response_data = {
                 "user_id": user_id,
@@ -118,8 +123,8 @@ async def run_tests():
         
         # Test 7: Get User Analytics
         print("7. Testing User Analytics...")
-        if isinstance(users_result['data'], list) and len(users_result['data']) > 0:
-            user_id = users_result['data'][0]['id']
+        if users:
+            user_id = users[0]['id']
             result = await test_endpoint(session, "GET", f"/analytics/user/{user_id}")
             print(f"   Status: {result['status']}")
             print(f"   Analytics: {result['data']}\n")
@@ -134,8 +139,8 @@ async def run_tests():
         
         # Test 9: Create Feedback
         print("9. Testing Feedback Creation...")
-        if isinstance(users_result['data'], list) and len(users_result['data']) > 0:
-            user_id = users_result['data'][0]['id']
+        if users:
+            user_id = users[0]['id']
             feedback_data = {
                 "user_id": user_id,
                 "ai_comment": "This is a test feedback comment for the user. Keep practicing to improve your scores!"
@@ -153,6 +158,28 @@ async def run_tests():
         print(f"   Status: {result['status']}")
         print(f"   Response: {result['data']}\n")
         
+        # Test 11: Streaming Score (point AI_API at backend/tests/fake_ai_backend.py to run it offline)
+        print("11. Testing Streaming Score...")
+        score_data = {
+            "question": "Describe your hometown.",
+            "answer": "I grew up in a small town near the river, and I still visit it every summer.",
+            "part": 1
+        }
+        try:
+            started = asyncio.get_running_loop().time()
+            first_event_after = None
+            events = 0
+            async with session.post(f"{BASE_URL}/ai/score/stream", json=score_data) as response:
+                print(f"   Status: {response.status}")
+                async for line in response.content:
+                    if line.startswith(b"data:"):
+                        events += 1
+                        if first_event_after is None:
+                            first_event_after = asyncio.get_running_loop().time() - started
+            print(f"   Events: {events}, first after {first_event_after or 0:.2f}s\n")
+        except Exception as e:
+            print(f"   Status: ERROR ({e})\n")
+        
         print("✅ All tests completed!")
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Fake AI scoring backend for local testing.
+Serves /score and a streaming /score/stream with canned band scores, so the API
+can be exercised without the model server:
+
+    uvicorn backend.tests.fake_ai_backend:app --port 8080
+    AI_API=http://localhost:8080 python backend/main.py
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from backend.models.schemas.schemas import ScoreRequests
+
+TOKEN_DELAY = 0.1  # seconds between streamed tokens
+
+app = FastAPI(title="Fake AI scoring backend")
+
+
+def fake_feedback(req: ScoreRequests) -> str:
+    words = len(req.answer.split())
+    band = min(9.0, 5.0 + words // 20 * 0.5)
+    return (
+        f"Fluency & Coherence: {band}\n"
+        f"Pronunciation: {band}\n"
+        f"Grammatical Range and Accuracy: {band}\n"
+        f"Lexical Resource: {band}\n"
+        f"Overall Band: {band}\n"
+        f"Your Part {req.part} answer has {words} words. Add examples and vary your sentence structures."
+    )
+
+
+@app.post("/score")
+async def score(req: ScoreRequests):
+    feedback = fake_feedback(req)
+    await asyncio.sleep(TOKEN_DELAY * len(feedback.split(" ")))  # as long as the whole stream takes
+    return {"score": feedback}
+
+
+@app.post("/score/stream")
+async def score_stream(req: ScoreRequests):
+    async def tokens():
+        for i, token in enumerate(fake_feedback(req).split(" ")):
+            await asyncio.sleep(TOKEN_DELAY)
+            yield (" " if i else "") + token
+
+    return StreamingResponse(tokens(), media_type="text/plain")
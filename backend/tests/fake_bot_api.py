@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Simulated Telegram Bot API for local testing.
+Answers the methods the bot uses and enforces flood limits like Telegram does
+(a global and a per-chat rate), replying 429 with ``retry_after`` when they are
+exceeded. ``GET /stats`` reports what was received:
+
+    uvicorn backend.tests.fake_bot_api:app --port 8081
+    BOT_API_URL=http://localhost:8081/bot BOT_TOKEN=123:test python backend/telegram_bot.py
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+GLOBAL_RATE = 30  # messages per second
+GLOBAL_BURST = 30  # messages allowed at once before the rate applies
+CHAT_RATE = 1  # messages per second into one chat
+CHAT_BURST = 5
+RETRY_AFTER = 1  # seconds
+LATENCY = 0.0  # seconds added to every call
+
+app = FastAPI(title="Simulated Telegram Bot API")
+
+message_ids = itertools.count(1)
+received = Counter()
+limited = Counter()
+by_chat = Counter()
+_buckets = {}  # key -> (tokens, updated)
+
+
+def _allow(key, rate: float, burst: float) -> bool:
+    now = time.monotonic()
+    tokens, updated = _buckets.get(key, (burst, now))
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens < 1:
+        _buckets[key] = (tokens, now)
+        return False
+    _buckets[key] = (tokens - 1, now)
+    return True
+
+
+async def _params(request: Request) -> dict:
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/json"):
+        return json.loads(body or b"{}")
+    return dict(parse_qsl(body.decode()))
+
+
+def _message(params: dict) -> dict:
+    return {
+        "message_id": int(params.get("message_id") or next(message_ids)),
+        "date": int(time.time()),
+        "chat": {"id": int(params.get("chat_id") or 0), "type": "private"},
+        "text": params.get("text", ""),
+    }
+
+
+@app.post("/bot{token}/{method}")
+async def call(token: str, method: str, request: Request):
+    params = await _params(request)
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+    if method == "getMe":
+        return {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "SpeakoAI", "username": "speako_test_bot"}}
+    if method not in ("sendMessage", "editMessageText"):
+        received[method] += 1
+        return {"ok": True, "result": True}
+
+    chat_id = params.get("chat_id")
+    if not _allow(("chat", chat_id), CHAT_RATE, CHAT_BURST) or not _allow("global", GLOBAL_RATE, GLOBAL_BURST):
+        limited[method] += 1
+        return JSONResponse(status_code=429, content={
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {RETRY_AFTER}",
+            "parameters": {"retry_after": RETRY_AFTER},
+        })
+
+    received[method] += 1
+    by_chat[chat_id] += 1
+    return {"ok": True, "result": _message(params)}
+
+
+@app.get("/stats")
+async def stats():
+    return {"received": received, "limited": limited, "chats": len(by_chat)}
+
+
+@app.post("/reset")
+async def reset():
+    for counter in (received, limited, by_chat):
+        counter.clear()
+    _buckets.clear()
+    return {"ok": True}
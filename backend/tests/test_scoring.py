@@ -0,0 +1,40 @@
+import pytest
+
+from backend.services.scoring import parse_assessment
+
+
+def test_parse_assessment_reads_every_criterion():
+    scores = parse_assessment(
+        "Fluency & Coherence: 6.5\n"
+        "Pronunciation: 7\n"
+        "Grammatical Range and Accuracy: 6\n"
+        "Lexical Resource: 7.5\n"
+        "Overall Band: 7\n"
+    )
+    assert scores["fluency_score"] == 6.5
+    assert scores["pronunciation_score"] == 7.0
+    assert scores["grammar_score"] == 6.0
+    assert scores["vocabulary_score"] == 7.5
+    assert scores["overall_score"] == 7.0
+
+
+def test_parse_assessment_ignores_band_in_criterion_lines():
+    scores = parse_assessment(
+        "Fluency band: 5\n"
+        "Pronunciation band: 6\n"
+        "Grammar band: 6\n"
+        "Vocabulary band: 7\n"
+        "**Overall band score:** 6.5\n"
+    )
+    assert scores["fluency_score"] == 5.0
+    assert scores["overall_score"] == 6.5
+
+
+def test_parse_assessment_averages_criteria_without_overall():
+    scores = parse_assessment("Fluency band: 6\nPronunciation: 6.5\nGrammar: 6\nVocabulary: 7\n")
+    assert scores["overall_score"] == 6.5
+
+
+def test_parse_assessment_rejects_text_without_scores():
+    with pytest.raises(ValueError):
+        parse_assessment("Something went wrong. No score returned.")
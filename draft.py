@@ -70,20 +70,6 @@
 #
 #
 # @app.get(
-#     "/api/analytics/leaderboard",
-#     response_model=List[UserScoreSchema],
-#     tags=["Analytics"],
-# )
-# async def get_leaderboard(
-#     limit: int = Query(10, ge=1, le=100, description="Number of top users to return")
-# ):
-#     """
-#     Get leaderboard of users ranked by average score
-#     """
-#     return await rq.get_leaderboard(limit)
-#
-#
-# @app.get(
 #     "/api/analytics/question/{question_id}",
 #     response_model=QuestionWithResponsesSchema,
 #     tags=["Analytics"],